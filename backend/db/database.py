@@ -3,6 +3,7 @@ import os
 import asyncio
 import asyncpg
 import logging
+from pgvector.asyncpg import register_vector
 
 log = logging.getLogger("soluris.db")
 
@@ -13,14 +14,63 @@ DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost:5432/soluris")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# Fixed-size pool: all connections are opened (and warmed) at startup
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+
+# pgvector type of legal_chunks.embedding, read by init_db: "halfvec" (fp16,
+# pgvector >= 0.7) once migrated by backend/scripts/migrate_halfvec.py, else
+# "vector" — queries cast to it so the HNSW index operator class matches
+EMBEDDING_TYPE = "vector"
+
+# True when pgvector is installed, so every pooled connection has its binary
+# codecs (set by init_db): embeddings can then be passed as plain lists of floats
+VECTOR_CODEC = False
+
+
+async def _warm_connection(conn: asyncpg.Connection):
+    """Run once per new pooled connection: primes asyncpg's statement cache
+    with the /health probe so it is served from a prepared statement, and
+    registers pgvector's binary codecs when the extension exists."""
+    await conn.fetchval("SELECT 1")
+    try:
+        await register_vector(conn)
+    except ValueError:
+        pass  # vector (or halfvec) type not installed
+
+
+async def _create_extensions() -> bool:
+    """Create the extensions on a one-off connection, before the pool opens,
+    so every pooled connection finds the pgvector types when it is warmed.
+    Returns True if pgvector is installed."""
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto;")
+        try:
+            await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+            log.info("✅ pgcrypto + pgvector extensions activated")
+        except Exception as ve:
+            log.warning(f"⚠️ pgvector not available: {ve} — running without vector search")
+        return await conn.fetchval(
+            "SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'vector')"
+        )
+    finally:
+        await conn.close()
+
 
 async def init_db():
-    global pool
+    global pool, EMBEDDING_TYPE, VECTOR_CODEC
     
     # Retry connection up to 5 times (DB may still be starting)
     for attempt in range(5):
         try:
-            pool = await asyncpg.create_pool(DATABASE_URL, min_size=2, max_size=10)
+            has_pgvector = await _create_extensions()
+            pool = await asyncpg.create_pool(
+                DATABASE_URL,
+                min_size=DB_POOL_SIZE,
+                max_size=DB_POOL_SIZE,
+                init=_warm_connection,
+            )
+            VECTOR_CODEC = has_pgvector
             break
         except Exception as e:
             log.warning(f"DB connection attempt {attempt+1}/5 failed: {e}")
@@ -32,14 +82,6 @@ async def init_db():
 
     try:
         async with pool.acquire() as conn:
-            # Extensions
-            await conn.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto;")
-            try:
-                await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
-                log.info("✅ pgcrypto + pgvector extensions activated")
-            except Exception as ve:
-                log.warning(f"⚠️ pgvector not available: {ve} — running without vector search")
-
             # ── Users ──
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS users (
@@ -122,6 +164,8 @@ async def init_db():
                 ("ALTER TABLE legal_documents ADD COLUMN IF NOT EXISTS metadata JSONB DEFAULT '{}'::jsonb", "metadata", "legal_documents"),
                 ("ALTER TABLE legal_documents ADD COLUMN IF NOT EXISTS reference TEXT", "reference", "legal_documents"),
                 ("ALTER TABLE legal_documents ADD COLUMN IF NOT EXISTS jurisdiction TEXT DEFAULT 'CH'", "jurisdiction", "legal_documents"),
+                ("ALTER TABLE legal_chunks ADD COLUMN IF NOT EXISTS text_hash BYTEA", "text_hash", "legal_chunks"),
+                ("CREATE INDEX IF NOT EXISTS idx_chunk_text_hash ON legal_chunks(text_hash)", "text_hash", "legal_chunks"),
             ]:
                 try:
                     await conn.execute(col_sql)
@@ -152,10 +196,18 @@ async def init_db():
                     await conn.execute("ALTER TABLE legal_chunks ADD COLUMN embedding vector(1024);")
                     log.info("✅ Migration complete")
 
+                # vector(1024), or halfvec(1024) once migrated (run
+                # backend/scripts/migrate_halfvec.py explicitly, not at startup)
+                udt = await conn.fetchval("""
+                    SELECT udt_name FROM information_schema.columns
+                    WHERE table_name = 'legal_chunks' AND column_name = 'embedding'
+                """)
+                EMBEDDING_TYPE = "halfvec" if udt == "halfvec" else "vector"
+
                 # ── HNSW index for fast similarity search ──
-                await conn.execute("""
+                await conn.execute(f"""
                     CREATE INDEX IF NOT EXISTS idx_chunk_embedding_hnsw
-                    ON legal_chunks USING hnsw (embedding vector_cosine_ops)
+                    ON legal_chunks USING hnsw (embedding {EMBEDDING_TYPE}_cosine_ops)
                     WITH (m = 16, ef_construction = 200);
                 """)
             except Exception as e:
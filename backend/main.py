@@ -7,6 +7,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 from backend.db.database import init_db
+from backend.services.rag import close_http_client
 from backend.routers import auth, chat, conversations, health
 try:
     from backend.routers import fiscal
@@ -37,6 +38,7 @@ except Exception as _e:
 async def lifespan(app: FastAPI):
     await init_db()
     yield
+    await close_http_client()
 
 
 app = FastAPI(title="Soluris API", version="1.0.0", lifespan=lifespan)
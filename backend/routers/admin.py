@@ -12,13 +12,17 @@ import asyncio
 import json
 import logging
 import os
+import threading
 import time
+from collections import deque
 from datetime import datetime
 from typing import Optional
 
 import asyncpg
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 from fastapi import APIRouter, BackgroundTasks, Header, HTTPException
 from pydantic import BaseModel
 
@@ -34,6 +38,21 @@ if DATABASE_URL.startswith("postgres://"):
 
 _jobs: dict = {}
 
+# BeautifulSoup sur libxml2 (C) si lxml est installé, sinon parseur pur Python
+try:
+    import lxml  # noqa: F401
+    _BS4_PARSER = "lxml"
+except ImportError:
+    _BS4_PARSER = "html.parser"
+
+# Décodage JSON en C (orjson) si disponible : les pages ES ATF font
+# plusieurs Mo (textes intégraux), json stdlib est 2-3x plus lent
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # ---------------------------------------------------------------------------
 # Auth
 # ---------------------------------------------------------------------------
@@ -131,6 +150,20 @@ async def _run_migrations(conn):
 # HTTP helpers (synchronous — run via asyncio.to_thread)
 # ---------------------------------------------------------------------------
 
+# Session partagée : connexions keep-alive réutilisées (un handshake TLS par
+# hôte au lieu d'un par requête) + retry avec backoff sur les 5xx/erreurs
+# réseau. Les POST (SPARQL, ES) sont des lectures, donc rejouables.
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=16, pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=None),
+))
+
+# Fedlex : seuls les sous-arbres <section>/<article> sont construits (les
+# titres de section restent dans l'arbre, <head>/scripts/navigation non)
+_FEDLEX_STRAINER = SoupStrainer(["section", "article"])
+
 def _sparql_get_html_url(rs_number: str) -> Optional[str]:
     """RS notation → HTML URL via SPARQL (2-step)."""
     # Step 1: ConsolidationAbstract URI
@@ -147,14 +180,15 @@ SELECT ?ca WHERE {{
 LIMIT 1
 """
     try:
-        r = requests.post(
+        _fedlex_pace()
+        r = _HTTP.post(
             "https://fedlex.data.admin.ch/sparqlendpoint",
             data={"query": query1},
             headers={"Accept": "application/sparql-results+json"},
             timeout=30,
         )
         r.raise_for_status()
-        rows = r.json()["results"]["bindings"]
+        rows = _json_loads(r.content)["results"]["bindings"]
         if not rows:
             log.warning(f"[ADMIN] No ConsolidationAbstract for RS {rs_number}")
             return None
@@ -178,14 +212,15 @@ SELECT ?url WHERE {{
 ORDER BY DESC(?cons) LIMIT 1
 """
     try:
-        r = requests.post(
+        _fedlex_pace()
+        r = _HTTP.post(
             "https://fedlex.data.admin.ch/sparqlendpoint",
             data={"query": query2},
             headers={"Accept": "application/sparql-results+json"},
             timeout=30,
         )
         r.raise_for_status()
-        rows = r.json()["results"]["bindings"]
+        rows = _json_loads(r.content)["results"]["bindings"]
         if rows:
             return rows[0]["url"]["value"]
         log.warning(f"[ADMIN] No HTML URL in SPARQL step2 for RS {rs_number}")
@@ -196,13 +231,13 @@ ORDER BY DESC(?cons) LIMIT 1
 
 def _fetch_and_parse_html(html_url: str, rs_number: str, title: str, abbrev: str) -> list[dict]:
     try:
-        resp = requests.get(html_url, timeout=60)
+        resp = _HTTP.get(html_url, timeout=60)
         resp.encoding = "utf-8"
     except Exception as e:
         log.error(f"[ADMIN] ❌ HTTP fetch {html_url}: {e}")
         return []
 
-    soup = BeautifulSoup(resp.content, "html.parser")
+    soup = BeautifulSoup(resp.content, _BS4_PARSER, parse_only=_FEDLEX_STRAINER)
     articles = soup.find_all("article")
     chunks = []
 
@@ -218,7 +253,8 @@ def _fetch_and_parse_html(html_url: str, rs_number: str, title: str, abbrev: str
 
         heading = art.find(["h6","h5","h4","h3"])
         art_num = heading.get_text(strip=True) if heading else art.get("id", "")
-        text = "\n".join(p.get_text(" ", strip=True) for p in art.find_all("p") if p.get_text(strip=True))
+        # Une seule extraction de texte par <p> (le filtre réutilise la chaîne)
+        text = "\n".join(t for t in (p.get_text(" ", strip=True) for p in art.find_all("p")) if t)
 
         if len(text.strip()) < 20:
             continue
@@ -238,7 +274,7 @@ def _fetch_and_parse_html(html_url: str, rs_number: str, title: str, abbrev: str
 
 def _fetch_cantonal_page(url: str) -> tuple[list[dict], str]:
     try:
-        resp = requests.get(url, timeout=30, headers={
+        resp = _HTTP.get(url, timeout=30, headers={
             "Accept-Language": "fr,de",
             "User-Agent": "Soluris/1.0 legal research"
         })
@@ -248,7 +284,7 @@ def _fetch_cantonal_page(url: str) -> tuple[list[dict], str]:
         log.error(f"[ADMIN] ❌ Canton fetch {url}: {e}")
         return [], str(e)
 
-    soup = BeautifulSoup(resp.content, "html.parser")
+    soup = BeautifulSoup(resp.content, _BS4_PARSER)
     articles = soup.find_all("article")
     if not articles:
         articles = soup.find_all(class_=lambda c: c and "article" in str(c).lower())
@@ -278,141 +314,208 @@ def _fetch_cantonal_page(url: str) -> tuple[list[dict], str]:
 # Ingestion functions
 # ---------------------------------------------------------------------------
 
+FEDLEX_FETCH_WORKERS = 4  # codes téléchargés/parsés en parallèle (écritures DB en série)
+FEDLEX_REQUEST_INTERVAL = 0.5  # écart minimal entre deux requêtes Fedlex, tous threads confondus
+ATF_SEARCH_INTERVAL = 0.3  # écart minimal entre deux pages ES ATF (3 req/s)
+
+_fedlex_pace_lock = threading.Lock()
+_fedlex_next_slot = 0.0
+
+
+def _fedlex_pace() -> None:
+    """Politesse : réserve le prochain créneau de requête Fedlex, partagé par
+    les threads de téléchargement, puis attend son heure."""
+    global _fedlex_next_slot
+    with _fedlex_pace_lock:
+        now = time.monotonic()
+        slot = max(now, _fedlex_next_slot)
+        _fedlex_next_slot = slot + FEDLEX_REQUEST_INTERVAL
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def _fetch_fedlex_code(rs_number: str, abbrev: str, title: str) -> tuple[Optional[str], list[dict]]:
+    """SPARQL → URL HTML → articles parsés, pour un code (dans un thread)."""
+    html_url = _sparql_get_html_url(rs_number)
+    if not html_url:
+        return None, []
+    _fedlex_pace()
+    return html_url, _fetch_and_parse_html(html_url, rs_number, title, abbrev)
+
+
 async def ingest_fedlex_codes(conn, rs_list: list, status: dict):
     total_chunks = 0
     errors = []
 
-    for i, (rs_number, abbrev, title) in enumerate(rs_list):
-        status["current"] = f"{abbrev} (RS {rs_number}) [{i+1}/{len(rs_list)}]"
-        status["progress"] = f"{i+1}/{len(rs_list)}"
-        log.info(f"[ADMIN] Fedlex {abbrev} RS {rs_number}...")
+    # Téléchargement + parsing en avance pendant que les codes déjà prêts sont
+    # insérés, dans l'ordre, sur l'unique connexion. Fenêtre glissante : au
+    # plus FEDLEX_FETCH_WORKERS codes en cours ou prêts (actes parsés en mémoire)
+    fetches = deque()
+    pending_codes = iter(rs_list)
 
-        html_url = await asyncio.to_thread(_sparql_get_html_url, rs_number)
-        if not html_url:
-            errors.append(f"RS {rs_number}: no HTML URL")
-            continue
+    def _fetch_next():
+        code = next(pending_codes, None)
+        if code is not None:
+            fetches.append(asyncio.create_task(asyncio.to_thread(_fetch_fedlex_code, *code)))
 
-        await asyncio.sleep(0.5)
+    for _ in range(FEDLEX_FETCH_WORKERS):
+        _fetch_next()
+    try:
+        for i, (rs_number, abbrev, title) in enumerate(rs_list):
+            status["current"] = f"{abbrev} (RS {rs_number}) [{i+1}/{len(rs_list)}]"
+            status["progress"] = f"{i+1}/{len(rs_list)}"
+            log.info(f"[ADMIN] Fedlex {abbrev} RS {rs_number}...")
 
-        chunks = await asyncio.to_thread(_fetch_and_parse_html, html_url, rs_number, title, abbrev)
-        if not chunks:
-            errors.append(f"RS {rs_number}: no articles parsed")
-            continue
+            html_url, chunks = await fetches.popleft()
+            _fetch_next()
+            if not html_url:
+                errors.append(f"RS {rs_number}: no HTML URL")
+                continue
 
-        full_text = "\n\n".join(c["text"] for c in chunks)
+            if not chunks:
+                errors.append(f"RS {rs_number}: no articles parsed")
+                continue
 
-        try:
-            doc_id = await conn.fetchval(
-                """
-                INSERT INTO legal_documents
-                  (source, external_id, doc_type, title, reference, language, content, url)
-                VALUES ('fedlex', $1, 'legislation', $2, $3, 'fr', $4, $5)
-                ON CONFLICT (source, external_id) DO UPDATE
-                  SET title=EXCLUDED.title, content=EXCLUDED.content, url=EXCLUDED.url
-                RETURNING id
-                """,
-                rs_number, title, f"RS {rs_number}", full_text[:100000], html_url,
-            )
-        except Exception as e:
-            log.error(f"[ADMIN] ❌ Doc insert RS {rs_number}: {e}")
-            errors.append(f"RS {rs_number}: insert error {e}")
-            continue
+            full_text = "\n\n".join(c["text"] for c in chunks)
 
-        chunk_count = 0
-        for idx, chunk in enumerate(chunks):
             try:
-                await conn.execute(
+                doc_id = await conn.fetchval(
                     """
-                    INSERT INTO legal_chunks
-                      (document_id, chunk_index, chunk_text, source_ref, source_url)
-                    VALUES ($1, $2, $3, $4, $5)
-                    ON CONFLICT DO NOTHING
+                    INSERT INTO legal_documents
+                      (source, external_id, doc_type, title, reference, language, content, url)
+                    VALUES ('fedlex', $1, 'legislation', $2, $3, 'fr', $4, $5)
+                    ON CONFLICT (source, external_id) DO UPDATE
+                      SET title=EXCLUDED.title, content=EXCLUDED.content, url=EXCLUDED.url
+                    RETURNING id
                     """,
-                    doc_id, idx, chunk["text"], chunk["article_ref"], chunk["url"],
+                    rs_number, title, f"RS {rs_number}", full_text[:100000], html_url,
                 )
-                chunk_count += 1
             except Exception as e:
-                log.debug(f"[ADMIN] Chunk error: {e}")
+                log.error(f"[ADMIN] ❌ Doc insert RS {rs_number}: {e}")
+                errors.append(f"RS {rs_number}: insert error {e}")
+                continue
 
-        total_chunks += chunk_count
-        status["total_chunks"] = total_chunks
-        status["errors"] = errors
-        log.info(f"[ADMIN] ✅ RS {rs_number} ({abbrev}): {chunk_count} chunks")
+            chunk_count = 0
+            for idx, chunk in enumerate(chunks):
+                try:
+                    await conn.execute(
+                        """
+                        INSERT INTO legal_chunks
+                          (document_id, chunk_index, chunk_text, source_ref, source_url)
+                        VALUES ($1, $2, $3, $4, $5)
+                        ON CONFLICT DO NOTHING
+                        """,
+                        doc_id, idx, chunk["text"], chunk["article_ref"], chunk["url"],
+                    )
+                    chunk_count += 1
+                except Exception as e:
+                    log.debug(f"[ADMIN] Chunk error: {e}")
+
+            total_chunks += chunk_count
+            status["total_chunks"] = total_chunks
+            status["errors"] = errors
+            log.info(f"[ADMIN] ✅ RS {rs_number} ({abbrev}): {chunk_count} chunks")
+    finally:
+        # Job interrompu ou en erreur : les codes de la fenêtre déjà lancés
+        # dans un thread finissent, aucun autre ne part
+        for task in fetches:
+            task.cancel()
 
     return total_chunks
 
 
+def _fetch_atf_page(offset: int, size: int) -> list:
+    payload = {
+        "query": {"bool": {"must": [
+            {"term": {"Sprache": "fr"}},
+            {"prefix": {"SignaturNummer": "ATF"}},
+        ]}},
+        "sort": [{"Datum": {"order": "desc"}}],
+        "from": offset, "size": size,
+    }
+    try:
+        resp = _HTTP.post(
+            "https://entscheidsuche.ch/_search.php",
+            data=json.dumps(payload, separators=(",", ":")),
+            headers={"Content-Type": "application/json", "Accept-Encoding": "gzip"},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        return _json_loads(resp.content).get("hits", {}).get("hits", [])
+    except Exception as e:
+        log.error(f"[ADMIN] ❌ ATF search error offset={offset}: {e}")
+        return []
+
+
 async def ingest_atf_decisions(conn, limit: int, status: dict):
     total = 0
     offset = 0
     batch = 50
+    loop = asyncio.get_running_loop()
+    next_slot = 0.0
+
+    async def _paced_fetch(off):
+        # Politesse : au plus une requête ES toutes les ATF_SEARCH_INTERVAL s,
+        # mesurée entre débuts de requêtes (pas un sleep après les insertions)
+        nonlocal next_slot
+        delay = next_slot - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        next_slot = loop.time() + ATF_SEARCH_INTERVAL
+        return await asyncio.to_thread(_fetch_atf_page, off, batch)
+
+    # La page suivante est demandée pendant l'insertion de la page courante
+    pending = asyncio.create_task(_paced_fetch(offset))
+    try:
+        while total < limit:
+            hits = await pending
+            pending = None
+            if not hits:
+                break
+            if len(hits) == batch:
+                pending = asyncio.create_task(_paced_fetch(offset + batch))
+
+            for hit in hits:
+                src = hit.get("_source", {})
+                ref = src.get("SignaturNummer", "")
+                text = src.get("Text", src.get("Zusammenfassung", ""))
+                if not text or len(text.strip()) < 50:
+                    continue
 
-    while total < limit:
-        def fetch_batch(off):
-            payload = {
-                "query": {"bool": {"must": [
-                    {"term": {"Sprache": "fr"}},
-                    {"prefix": {"SignaturNummer": "ATF"}},
-                ]}},
-                "sort": [{"Datum": {"order": "desc"}}],
-                "from": off, "size": batch,
-            }
-            try:
-                resp = requests.post(
-                    "https://entscheidsuche.ch/_search.php",
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=30,
-                )
-                resp.raise_for_status()
-                return resp.json().get("hits", {}).get("hits", [])
-            except Exception as e:
-                log.error(f"[ADMIN] ❌ ATF search error offset={off}: {e}")
-                return []
-
-        hits = await asyncio.to_thread(fetch_batch, offset)
-        if not hits:
-            break
-
-        for hit in hits:
-            src = hit.get("_source", {})
-            ref = src.get("SignaturNummer", "")
-            text = src.get("Text", src.get("Zusammenfassung", ""))
-            if not text or len(text.strip()) < 50:
-                continue
-
-            try:
-                doc_id = await conn.fetchval(
-                    """
-                    INSERT INTO legal_documents
-                      (source, external_id, doc_type, title, reference, language, content, url)
-                    VALUES ('entscheidsuche', $1, 'jurisprudence', $2, $3, 'fr', $4, $5)
-                    ON CONFLICT (source, external_id) DO UPDATE
-                      SET content=EXCLUDED.content
-                    RETURNING id
-                    """,
-                    ref, src.get("Titel", ref), ref,
-                    text[:100000], src.get("URL", ""),
-                )
-                await conn.execute(
-                    """
-                    INSERT INTO legal_chunks
-                      (document_id, chunk_index, chunk_text, source_ref, source_url)
-                    VALUES ($1, 0, $2, $3, $4)
-                    ON CONFLICT DO NOTHING
-                    """,
-                    doc_id, text[:4000], ref, src.get("URL", ""),
-                )
-                total += 1
-            except Exception as e:
-                log.debug(f"[ADMIN] ATF insert error {ref}: {e}")
-
-        status["current"] = f"ATF: {total} arrêts ingérés"
-        status["total_atf"] = total
-        offset += batch
-        if len(hits) < batch:
-            break
-        await asyncio.sleep(0.3)
+                try:
+                    doc_id = await conn.fetchval(
+                        """
+                        INSERT INTO legal_documents
+                          (source, external_id, doc_type, title, reference, language, content, url)
+                        VALUES ('entscheidsuche', $1, 'jurisprudence', $2, $3, 'fr', $4, $5)
+                        ON CONFLICT (source, external_id) DO UPDATE
+                          SET content=EXCLUDED.content
+                        RETURNING id
+                        """,
+                        ref, src.get("Titel", ref), ref,
+                        text[:100000], src.get("URL", ""),
+                    )
+                    await conn.execute(
+                        """
+                        INSERT INTO legal_chunks
+                          (document_id, chunk_index, chunk_text, source_ref, source_url)
+                        VALUES ($1, 0, $2, $3, $4)
+                        ON CONFLICT DO NOTHING
+                        """,
+                        doc_id, text[:4000], ref, src.get("URL", ""),
+                    )
+                    total += 1
+                except Exception as e:
+                    log.debug(f"[ADMIN] ATF insert error {ref}: {e}")
+
+            status["current"] = f"ATF: {total} arrêts ingérés"
+            status["total_atf"] = total
+            offset += batch
+            if pending is None:
+                break
+    finally:
+        if pending is not None:
+            pending.cancel()
 
     return total
 
@@ -4,16 +4,18 @@ Endpoint fiscal dédié tAIx — /api/fiscal-query
 Route interne (clé API statique) permettant à tAIx (juraitax) d'interroger
 la base Soluris en mode RAG fiscal.
 
-Sécurité : clé `internal_key` validée contre variable d'env TAIX_INTERNAL_KEY.
+Sécurité : clé interne validée contre variable d'env TAIX_INTERNAL_KEY, lue
+dans l'en-tête `X-Internal-Key` (recommandé) ou, à défaut, dans le champ
+`internal_key` du corps. La clé est vérifiée avant la validation Pydantic.
 Sans authentification JWT utilisateur — communication service-à-service.
 
 Usage tAIx :
   POST /api/fiscal-query
+  X-Internal-Key: <TAIX_INTERNAL_KEY>
   {
     "question": "Montant max déductible pilier 3a 2025 ?",
     "canton": "GE",
-    "annee": 2025,
-    "internal_key": "<TAIX_INTERNAL_KEY>"
+    "annee": 2025
   }
 
 Réponse :
@@ -27,10 +29,14 @@ Réponse :
 """
 
 import os
+import json
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 log = logging.getLogger("fiscal")
@@ -42,6 +48,7 @@ router = APIRouter(prefix="/api", tags=["fiscal"])
 # ---------------------------------------------------------------------------
 
 TAIX_INTERNAL_KEY = os.getenv("TAIX_INTERNAL_KEY", "")
+FISCAL_BATCH_MAX = 32  # Questions max par appel /fiscal-query/batch
 
 
 def verify_internal_key(internal_key: str) -> None:
@@ -52,6 +59,57 @@ def verify_internal_key(internal_key: str) -> None:
         raise HTTPException(status_code=403, detail="Invalid internal_key")
 
 
+async def require_internal_key(
+    request: Request,
+    x_internal_key: Optional[str] = Header(None),
+) -> None:
+    """Dépendance : valide la clé (en-tête, sinon champ du corps) avant que
+    FastAPI ne construise le modèle Pydantic de la requête."""
+    key = x_internal_key
+    if key is None:
+        try:
+            body = await request.json()  # mis en cache par Starlette
+        except Exception:
+            body = None
+        key = body.get("internal_key") if isinstance(body, dict) else None
+    verify_internal_key(key or "")
+
+
+# ---------------------------------------------------------------------------
+# Limitation de concurrence RAG (embeddings + pgvector + Claude)
+# ---------------------------------------------------------------------------
+
+FISCAL_CONCURRENCY = int(os.getenv("FISCAL_CONCURRENCY", "16"))
+FISCAL_MAX_QUEUE = int(os.getenv("FISCAL_MAX_QUEUE", "64"))
+
+_RAG_SEM = asyncio.Semaphore(FISCAL_CONCURRENCY)
+_rag_queued = 0
+
+
+def _check_backpressure() -> None:
+    """Refuse (429) si toutes les places sont prises et la file d'attente pleine."""
+    if _RAG_SEM.locked() and _rag_queued >= FISCAL_MAX_QUEUE:
+        raise HTTPException(status_code=429, detail="Backpressure: too many concurrent fiscal queries")
+
+
+@asynccontextmanager
+async def _rag_slot(fail_fast: bool = True):
+    """Occupe une place du sémaphore RAG le temps d'un appel à generate_answer.
+    Les appelants en attente patientent ici plutôt que dans le pipeline RAG."""
+    global _rag_queued
+    if fail_fast:
+        _check_backpressure()
+    _rag_queued += 1
+    try:
+        await _RAG_SEM.acquire()
+    finally:
+        _rag_queued -= 1
+    try:
+        yield
+    finally:
+        _RAG_SEM.release()
+
+
 # ---------------------------------------------------------------------------
 # Modèles Pydantic
 # ---------------------------------------------------------------------------
@@ -60,10 +118,18 @@ class FiscalQueryRequest(BaseModel):
     question: str
     canton: Optional[str] = None     # Code canton ISO (GE, VD, JU, ...) ou None = fédéral
     annee: Optional[int] = None      # Année fiscale (ex: 2025)
-    internal_key: str
+    internal_key: Optional[str] = None  # Déprécié : préférer l'en-tête X-Internal-Key
     max_sources: int = 5             # Nombre max de chunks RAG à inclure
 
 
+class FiscalBatchRequest(BaseModel):
+    questions: list[str]
+    canton: Optional[str] = None
+    annee: Optional[int] = None
+    internal_key: Optional[str] = None  # Déprécié : préférer l'en-tête X-Internal-Key
+    max_sources: int = 5
+
+
 class FiscalSource(BaseModel):
     reference: str    # ex: "Art. 82 LPP" ou "Art. 10 LIPP-GE"
     titre: str
@@ -102,6 +168,9 @@ FORMAT DE RÉPONSE :
 Tu réponds en français, même pour des lois allemandes ou italiennes (traduire les extraits pertinents)."""
 
 
+_EMPTY: dict = {}  # Métadonnées absentes (partagé, jamais modifié)
+
+
 def build_fiscal_context(chunks: list[dict], canton: Optional[str], annee: Optional[int]) -> str:
     """Construit le contexte RAG pour la requête fiscale."""
     header = "=== SOURCES JURIDIQUES FISCALES ===\n"
@@ -113,12 +182,12 @@ def build_fiscal_context(chunks: list[dict], canton: Optional[str], annee: Optio
 
     context_parts = []
     for i, chunk in enumerate(chunks, 1):
-        meta = chunk.get("metadata", {})
-        ref = meta.get("article_number", f"§{i}")
-        law = meta.get("law_name") or meta.get("act_title") or meta.get("act_short", "")
-        jurisdiction = meta.get("jurisdiction", "CH")
-        source_url = meta.get("source_url") or meta.get("fedlex_url", "")
-        text = chunk.get("text", "")
+        meta = chunk.get("metadata") or _EMPTY
+        ref = meta.get("article_number") or f"§{i}"
+        law = meta.get("law_name") or meta.get("act_title") or meta.get("act_short") or ""
+        jurisdiction = meta.get("jurisdiction") or "CH"
+        source_url = meta.get("source_url") or meta.get("fedlex_url") or ""
+        text = chunk.get("text") or ""
 
         context_parts.append(
             f"[Source {i}] {ref} {law} ({jurisdiction})\n"
@@ -133,34 +202,21 @@ def build_fiscal_context(chunks: list[dict], canton: Optional[str], annee: Optio
 # Route principale
 # ---------------------------------------------------------------------------
 
-@router.post("/fiscal-query", response_model=FiscalQueryResponse)
-async def fiscal_query(req: FiscalQueryRequest):
-    """Point d'entrée RAG fiscal pour tAIx — authentification clé interne."""
-    verify_internal_key(req.internal_key)
-
-    from backend.services.rag import generate_answer
+def _enrich_question(question: str, canton: Optional[str], annee: Optional[int]) -> str:
+    """Ajoute canton et année fiscale à la question pour orienter la recherche."""
+    enriched = question
+    if canton:
+        enriched += f" (Canton: {canton})"
+    if annee:
+        enriched += f" (Année fiscale: {annee})"
+    return enriched
 
-    enriched = req.question
-    if req.canton:
-        enriched += f" (Canton: {req.canton})"
-    if req.annee:
-        enriched += f" (Année fiscale: {req.annee})"
 
-    try:
-        result = await generate_answer(
-            question=enriched,
-            history=[],
-            jurisdiction=req.canton.upper() if req.canton else None,
-            legal_domain="droit_fiscal",
-        )
-    except Exception as e:
-        log.error(f"RAG fiscal error: {e}")
-        raise HTTPException(status_code=502, detail="RAG service unavailable")
-
-    # generate_answer retourne {"response": ..., "sources": [...], "confidence": ...}
+def _fiscal_sources(raw_sources: list[dict], canton: Optional[str]) -> list[FiscalSource]:
+    """Dédoublonne et normalise les sources citées par generate_answer."""
     sources = []
     seen = set()
-    for s in result.get("sources", []):
+    for s in raw_sources:
         ref = s.get("reference") or s.get("article_number") or "Disposition fiscale"
         if ref in seen:
             continue
@@ -169,18 +225,152 @@ async def fiscal_query(req: FiscalQueryRequest):
             reference=ref,
             titre=s.get("titre") or s.get("law_name") or "Droit fiscal suisse",
             url=s.get("url") or s.get("fedlex_url") or "https://www.fedlex.admin.ch",
-            jurisdiction=s.get("jurisdiction") or req.canton or "CH",
+            jurisdiction=s.get("jurisdiction") or canton or "CH",
         ))
+    return sources
+
 
+def _confidence_score(conf_raw) -> float:
+    """Convertit le niveau de confiance RAG ("high", "moderate", ...) en score."""
     confidence_map = {"high": 0.85, "moderate": 0.60, "none": 0.0}
-    conf_raw = result.get("confidence", "none")
-    confidence = confidence_map.get(conf_raw, 0.5) if isinstance(conf_raw, str) else float(conf_raw)
+    return confidence_map.get(conf_raw, 0.5) if isinstance(conf_raw, str) else float(conf_raw)
 
+
+def _to_fiscal_response(result: dict, canton: Optional[str]) -> FiscalQueryResponse:
+    """Convertit le résultat de generate_answer en FiscalQueryResponse."""
+    # generate_answer retourne {"response": ..., "sources": [...], "confidence": ...}
     return FiscalQueryResponse(
         reponse=result.get("response", ""),
-        sources=sources,
-        confidence=confidence,
-        canton=req.canton,
+        sources=_fiscal_sources(result.get("sources", []), canton),
+        confidence=_confidence_score(result.get("confidence", "none")),
+        canton=canton,
+    )
+
+
+def _sse(data, event: Optional[str] = None) -> str:
+    """Formate un événement Server-Sent Events (données JSON sur une ligne)."""
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+
+@router.post(
+    "/fiscal-query",
+    response_model=FiscalQueryResponse,
+    dependencies=[Depends(require_internal_key)],
+)
+async def fiscal_query(req: FiscalQueryRequest):
+    """Point d'entrée RAG fiscal pour tAIx — authentification clé interne."""
+    from backend.services.rag import generate_answer
+
+    try:
+        async with _rag_slot():
+            result = await generate_answer(
+                question=_enrich_question(req.question, req.canton, req.annee),
+                history=[],
+                jurisdiction=req.canton.upper() if req.canton else None,
+                legal_domain="droit_fiscal",
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error(f"RAG fiscal error: {e}")
+        raise HTTPException(status_code=502, detail="RAG service unavailable")
+
+    return _to_fiscal_response(result, req.canton)
+
+
+@router.post(
+    "/fiscal-query/batch",
+    response_model=list[FiscalQueryResponse],
+    dependencies=[Depends(require_internal_key)],
+)
+async def fiscal_query_batch(req: FiscalBatchRequest):
+    """Variante batch pour tAIx : un seul appel d'embedding pour toutes les
+    questions, puis recherche + génération en parallèle. Chaque question
+    occupe sa propre place du sémaphore RAG."""
+    from backend.services.rag import generate_answers_batch
+
+    if not req.questions:
+        return []
+    if len(req.questions) > FISCAL_BATCH_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many questions (max {FISCAL_BATCH_MAX} per batch)",
+        )
+
+    _check_backpressure()
+    try:
+        results = await generate_answers_batch(
+            [_enrich_question(q, req.canton, req.annee) for q in req.questions],
+            jurisdiction=req.canton.upper() if req.canton else None,
+            legal_domain="droit_fiscal",
+            slot=lambda: _rag_slot(fail_fast=False),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error(f"RAG fiscal batch error: {e}")
+        raise HTTPException(status_code=502, detail="RAG service unavailable")
+
+    return [_to_fiscal_response(r, req.canton) for r in results]
+
+
+@router.post(
+    "/fiscal-query/stream",
+    dependencies=[Depends(require_internal_key)],
+)
+async def fiscal_query_stream(req: FiscalQueryRequest):
+    """Variante streaming (SSE) : les sources récupérées sont envoyées dès la
+    fin de la recherche, puis le texte au fil de la génération Claude.
+
+    Événements : `sources` (chunks récupérés), `data` ({"text": ...}),
+    `done` (sources citées + confiance) ou `error`.
+    """
+    from backend.services.rag import generate_answer_stream
+
+    # Le 429 doit partir avant l'ouverture du flux
+    _check_backpressure()
+
+    async def events():
+        async with _rag_slot(fail_fast=False):
+            async for ev in generate_answer_stream(
+                question=_enrich_question(req.question, req.canton, req.annee),
+                history=[],
+                jurisdiction=req.canton.upper() if req.canton else None,
+                legal_domain="droit_fiscal",
+            ):
+                etype = ev["type"]
+                if etype == "context":
+                    retrieved = [
+                        {
+                            "reference": c.get("source_ref") or c.get("doc_reference"),
+                            "titre": c.get("doc_title"),
+                            "url": c.get("source_url") or c.get("doc_url"),
+                            "jurisdiction": c.get("jurisdiction"),
+                        }
+                        for c in ev["chunks"][:req.max_sources]
+                    ]
+                    sources = _fiscal_sources(retrieved, req.canton)
+                    yield _sse([s.model_dump() for s in sources], event="sources")
+                elif etype == "text":
+                    yield _sse({"text": ev["text"]})
+                elif etype == "done":
+                    yield _sse({
+                        "sources": [s.model_dump() for s in _fiscal_sources(ev["sources"], req.canton)],
+                        "confidence": _confidence_score(ev["confidence"]),
+                        "canton": req.canton,
+                        "domain": "droit_fiscal",
+                    }, event="done")
+                elif etype == "error":
+                    log.error(f"RAG fiscal stream error: {ev['message']}")
+                    yield _sse({"detail": ev["message"]}, event="error")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 # ---------------------------------------------------------------------------
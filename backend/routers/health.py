@@ -10,9 +10,8 @@ async def health():
     db_ok = False
     try:
         if database.pool is not None:
-            async with database.pool.acquire() as conn:
-                await conn.fetchval("SELECT 1")
-                db_ok = True
+            # pool.fetchval releases the connection before the response is built
+            db_ok = await database.pool.fetchval("SELECT 1") == 1
     except Exception:
         pass
     return {"status": "ok" if db_ok else "degraded", "database": db_ok, "service": "soluris"}
@@ -13,29 +13,84 @@ Usage :
   python -m backend.scrapers.cantonal_tax --canton GE
   python -m backend.scrapers.cantonal_tax --canton all
   python -m backend.scrapers.cantonal_tax --mode list
+  python -m backend.scrapers.cantonal_tax --canton GE --pretty   # JSON indenté
 """
 
 import argparse
+import asyncio
+import hashlib
 import json
 import logging
+import multiprocessing
+import os
 import re
+import sys
+import threading
 import time
-from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+from urllib.parse import urlparse
 
-import requests
-from bs4 import BeautifulSoup
+import charset_normalizer
+import httpx
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser  # parseur C (lexbor), 10-20x bs4
+except ImportError:  # selectolax optionnel : repli sur BeautifulSoup
+    LexborHTMLParser = None
+
+try:
+    import orjson  # sérialisation JSON en C, bien plus rapide que json sur du texte UTF-8
+except ImportError:  # orjson optionnel : repli sur json
+    orjson = None
+
+try:
+    import pypdfium2 as pdfium  # extraction texte PDFium (C++), bien plus rapide que pdfplumber
+except ImportError:  # pypdfium2 optionnel : repli sur pdfplumber
+    pdfium = None
+
+try:
+    import lxml  # noqa: F401 — backend C pour BeautifulSoup (~10x html.parser)
+    _BS_PARSER = "lxml"
+except ImportError:
+    _BS_PARSER = "html.parser"
+
+try:
+    from cssselect import HTMLTranslator  # CSS → XPath, pour lxml sans bs4
+    from lxml import html as lxml_html
+    from lxml.etree import XPath
+except ImportError:
+    lxml_html = None
+
+# Backend DOM, du plus rapide au plus lent
+if LexborHTMLParser is not None:
+    _DOM = "lexbor"
+elif lxml_html is not None:
+    _DOM = "lxml"
+else:
+    _DOM = "bs4"
 
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
 
-REQUEST_DELAY = 1.0        # politesse envers les serveurs cantonaux
+REQUEST_DELAY = 1.0        # politesse envers les serveurs cantonaux (par hôte)
+MAX_CONCURRENT_CANTONS = 5
 REQUEST_TIMEOUT = 60
 MAX_CHUNK_CHARS = 2000
+ART_PREFIX_CHARS = 60      # le numéro d'article est cherché en tête d'élément
 MIN_CHUNK_CHARS = 50
+PDF_PAGES_PER_WORKER = 50  # en dessous, le démarrage d'un processus coûte plus qu'il ne rapporte
 OUTPUT_DIR = Path("data/cantonal_tax")
+ETAGS_FILE = OUTPUT_DIR / "etags.json"   # URL → validateurs HTTP + sha256
+CHUNK_CACHE_DIR = OUTPUT_DIR / "_chunk_cache"  # chunks parsés, par hash du HTML
+CHUNK_CACHE_VERSION = 1    # à incrémenter quand le parsing change
 
 logging.basicConfig(
     level=logging.INFO,
@@ -331,7 +386,7 @@ AFC_CIRCULAIRES = [
 # Data models
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class CantonalChunk:
     """Un chunk de droit fiscal cantonal (article ou alinéa)."""
     article_id: str          # e.g. "ge_lipp_art_10"
@@ -347,6 +402,12 @@ class CantonalChunk:
     legal_domain: str = "droit_fiscal"
 
 
+_CHUNK_FIELDS = tuple(f.name for f in fields(CantonalChunk))
+_chunk_row = attrgetter(*_CHUNK_FIELDS)  # chunk → tuple des champs, en C
+_INTERNED_FIELDS = ("jurisdiction", "law_name", "rs_cantonal", "source_url",
+                    "language", "doc_type", "legal_domain")
+
+
 # ---------------------------------------------------------------------------
 # HTTP helpers
 # ---------------------------------------------------------------------------
@@ -356,108 +417,520 @@ HEADERS = {
     "Accept-Language": "fr-CH,fr;q=0.9,de-CH;q=0.8",
 }
 
+# brotli (~20 % de moins que gzip sur le HTML des portails) : httpx ne sait
+# le décoder que si le paquet brotli est installé, sinon rester en gzip.
+try:
+    import brotli  # noqa: F401
+    HEADERS["Accept-Encoding"] = "br, gzip"
+except ImportError:
+    HEADERS["Accept-Encoding"] = "gzip"
+
+
+def _detect_encoding(content: bytes) -> str:
+    """Encodage d'une page servie sans charset dans Content-Type (portails
+    cantonaux en Latin-1/cp1252) : détection sur le contenu, comme
+    apparent_encoding de requests, UTF-8 à défaut."""
+    best = charset_normalizer.from_bytes(content).best()
+    return best.encoding if best is not None else "utf-8"
+
+
+# Client partagé : connexions keep-alive réutilisées d'un canton/article à
+# l'autre (plus de handshake TCP+TLS par requête), HTTP/2 si le serveur l'accepte.
+_HTTP = httpx.Client(
+    headers=HEADERS,
+    default_encoding=_detect_encoding,
+    timeout=REQUEST_TIMEOUT,
+    http2=True,
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+)
+
+
+# ---------------------------------------------------------------------------
+# Cache HTTP (GET conditionnel) — les lois cantonales changent rarement
+# ---------------------------------------------------------------------------
+
+NOT_MODIFIED = object()  # sentinelle : contenu inchangé depuis le dernier scrape
+
+_ETAGS_LOCK = threading.Lock()
+_etags: Optional[dict[str, dict]] = None
+_etags_pending: dict[str, dict] = {}  # URL → validateurs reçus, pas encore validés
+_etags_dirty = False
+
+
+def _load_etags() -> dict[str, dict]:
+    """Charge (une fois) le cache etags.json ; à appeler sous _ETAGS_LOCK."""
+    global _etags
+    if _etags is None:
+        try:
+            _etags = json.loads(ETAGS_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            _etags = {}
+    return _etags
+
+
+def _conditional_headers(url: str) -> dict[str, str]:
+    """En-têtes If-None-Match / If-Modified-Since issus du cache."""
+    with _ETAGS_LOCK:
+        entry = _load_etags().get(url, {})
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _remember_response(url: str, r: httpx.Response) -> bool:
+    """Met de côté ETag/Last-Modified/sha256 du corps (validés par
+    _commit_validators une fois l'export écrit). Retourne True si le contenu
+    a changé (détecte aussi les serveurs sans validateurs HTTP)."""
+    digest = hashlib.sha256(r.content).hexdigest()
+    with _ETAGS_LOCK:
+        changed = _load_etags().get(url, {}).get("sha256") != digest
+        _etags_pending[url] = {
+            "etag": r.headers.get("etag"),
+            "last_modified": r.headers.get("last-modified"),
+            "sha256": digest,
+        }
+    return changed
+
+
+def _commit_validators(url: str) -> None:
+    """Valide les validateurs de `url` après écriture de l'export qui en
+    dépend : un échec de parsing ou d'écriture (ou un crash) laisse l'ancien
+    état, et la page sera retéléchargée au prochain run."""
+    global _etags_dirty
+    with _ETAGS_LOCK:
+        entry = _etags_pending.pop(url, None)
+        if entry is not None:
+            _load_etags()[url] = entry
+            _etags_dirty = True
+
+
+def _flush_etags() -> None:
+    """Écrit etags.json une seule fois en fin de run (si modifié)."""
+    global _etags_dirty
+    with _ETAGS_LOCK:
+        if not _etags_dirty:
+            return
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        ETAGS_FILE.write_text(json.dumps(_etags, indent=2), encoding="utf-8")
+        _etags_dirty = False
+
+
+_RATE_LOCK = threading.Lock()
+_next_allowed: dict[str, float] = {}  # hôte → instant (monotonic) de la prochaine requête
 
-def fetch_html(url: str) -> Optional[str]:
-    """Télécharge une page HTML avec retry."""
+
+def _wait_for_host(url: str) -> None:
+    """Espace de REQUEST_DELAY les requêtes vers un même hôte ; les hôtes
+    différents ne s'attendent pas. Le créneau est réservé sous verrou puis
+    attendu hors verrou (appelé depuis plusieurs threads)."""
+    host = urlparse(url).netloc
+    with _RATE_LOCK:
+        now = time.monotonic()
+        slot = max(now, _next_allowed.get(host, 0.0))
+        _next_allowed[host] = slot + REQUEST_DELAY
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def _get(url: str, conditional: bool):
+    """GET avec retry. Retourne la réponse, NOT_MODIFIED (304 ou sha256
+    identique, si `conditional`) ou None en cas d'échec."""
+    headers = _conditional_headers(url) if conditional else {}
     for attempt in range(3):
+        _wait_for_host(url)
         try:
-            r = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+            r = _HTTP.get(url, headers=headers)
+            if r.status_code == 304:
+                return NOT_MODIFIED
             r.raise_for_status()
-            r.encoding = r.apparent_encoding or "utf-8"
-            return r.text
-        except requests.RequestException as e:
+            changed = _remember_response(url, r)
+            if conditional and not changed:
+                return NOT_MODIFIED
+            return r
+        except httpx.HTTPError as e:
             log.warning(f"Attempt {attempt+1}/3 failed for {url}: {e}")
             time.sleep(2 ** attempt)
     return None
 
 
-def fetch_pdf_text(url: str) -> Optional[str]:
-    """Télécharge un PDF et extrait le texte avec pdfplumber."""
+def fetch_html(url: str, conditional: bool = False):
+    """Télécharge une page HTML avec retry (NOT_MODIFIED si inchangée)."""
+    r = _get(url, conditional)
+    if r is None or r is NOT_MODIFIED:
+        return r
+    return r.text
+
+
+def fetch_pdf_text(url: str, conditional: bool = False):
+    """Télécharge un PDF et en extrait le texte (NOT_MODIFIED si inchangé)."""
+    r = _get(url, conditional)
+    if r is None or r is NOT_MODIFIED:
+        return r
     try:
-        import io
-        import pdfplumber
-        r = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
-        r.raise_for_status()
-        with pdfplumber.open(io.BytesIO(r.content)) as pdf:
-            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-        return text
+        return _extract_pdf_text(r.content)
     except Exception as e:
         log.warning(f"PDF extraction failed for {url}: {e}")
         return None
 
 
+def _plumber_page_text(content: bytes, index: int) -> str:
+    """Texte d'une page via pdfplumber (lent : calcule toute la mise en page)."""
+    import io
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        return pdf.pages[index].extract_text() or ""
+
+
+def _extract_page_range(args: tuple[bytes, int, int]) -> list[str]:
+    """Texte des pages [start, stop) via PDFium, repli pdfplumber par page.
+    Fonction de module : exécutée dans les processus du pool."""
+    content, start, stop = args
+    pdf = pdfium.PdfDocument(content)
+    try:
+        pages = []
+        for i in range(start, stop):
+            try:
+                page = pdf[i]
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+            except Exception as e:
+                log.debug(f"PDFium failed on page {i}, falling back to pdfplumber: {e}")
+                pages.append(_plumber_page_text(content, i))
+        return pages
+    finally:
+        pdf.close()
+
+
+def _extract_pdf_text(content: bytes) -> str:
+    """Texte brut du PDF : PDFium (5-10x pdfplumber) page par page, avec
+    repli pdfplumber sur les pages qui échouent ou si pypdfium2 est absent.
+    Les gros PDF sont répartis par plages de pages sur un pool de processus
+    (extraction CPU-bound, verrou PDFium par document)."""
+    if pdfium is None:
+        import io
+        import pdfplumber
+        with pdfplumber.open(io.BytesIO(content)) as pdf:
+            return "\n".join(page.extract_text() or "" for page in pdf.pages)
+
+    pdf = pdfium.PdfDocument(content)
+    n_pages = len(pdf)
+    pdf.close()
+
+    workers = min(os.cpu_count() or 1, n_pages // PDF_PAGES_PER_WORKER)
+    if workers <= 1:
+        return "\n".join(_extract_page_range((content, 0, n_pages)))
+
+    # Une plage contiguë par worker : le PDF n'est transmis qu'une fois par processus.
+    # "spawn" : pas de fork d'un processus multi-threadé (scrape via asyncio.to_thread).
+    step = -(-n_pages // workers)
+    ranges = [(content, i, min(i + step, n_pages)) for i in range(0, n_pages, step)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        return "\n".join(text for pages in ex.map(_extract_page_range, ranges) for text in pages)
+
+
+# ---------------------------------------------------------------------------
+# DOM helpers (selectolax, sinon lxml + XPath, sinon BeautifulSoup)
+# ---------------------------------------------------------------------------
+
+# Repli bs4 : ne matérialiser que les balises porteuses de texte légal.
+# <head>, <script>, <style>, <nav>... ne sont pas construits, donc aucun
+# sélecteur ne peut les viser (inutile pour le corps des lois).
+_BS_STRAINER = SoupStrainer(["div", "article", "section", "main", "p", "td"])
+
+
+def _parse_dom(html: str):
+    """Construit l'arbre DOM avec le parseur le plus rapide disponible."""
+    if _DOM == "lexbor":
+        return LexborHTMLParser(html)
+    if _DOM == "lxml":
+        try:
+            return lxml_html.document_fromstring(html)
+        except ValueError:
+            # str avec déclaration d'encodage XML : lxml exige des bytes
+            return lxml_html.document_fromstring(
+                html.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8"),
+            )
+    return BeautifulSoup(html, _BS_PARSER, parse_only=_BS_STRAINER)
+
+
+_SIMPLE_SELECTOR_RE = re.compile(r"([a-zA-Z][a-zA-Z0-9]*)?(?:\.([\w-]+))?")
+_COMBINATOR_RE = re.compile(r"[\s>+~]")
+_ATTR_RE = re.compile(r"\[[^\]]*\]")
+
+
+@lru_cache(maxsize=128)
+def _parse_simple_selector(selector: str) -> Optional[tuple[Optional[str], Optional[str]]]:
+    """(tag, classe) pour les sélecteurs simples ("div.article", ".law-article",
+    "section"), None pour le reste ("div[id^='art']", ".legis-text p"...)."""
+    m = _SIMPLE_SELECTOR_RE.fullmatch(selector.strip())
+    if not m or not any(m.groups()):
+        return None
+    return m.group(1), m.group(2)
+
+
+@lru_cache(maxsize=256)
+def _xpath(selector: str, prefix: str = "descendant-or-self::"):
+    """XPath lxml précompilé équivalent au sélecteur CSS (via cssselect)."""
+    return XPath(HTMLTranslator().css_to_xpath(selector, prefix=prefix))
+
+
+def _lxml_matcher(selector: str):
+    """Test « l'élément correspond-il ? » pour lxml. Sans combinateur,
+    XPath relatif à l'élément (self::…) ; avec (".legis-text p"), appartenance
+    au résultat sur tout l'arbre, calculé une fois par document."""
+    if not _COMBINATOR_RE.search(_ATTR_RE.sub("", selector.strip())):
+        xp = _xpath(selector, "self::")
+        return lambda el: bool(xp(el))
+    xp = _xpath(selector)
+    memo: dict = {}
+
+    def match(el) -> bool:
+        root = el.getroottree().getroot()  # proxy stable tant que référencé
+        if memo.get("root") is not root:
+            memo["root"], memo["hits"] = root, set(xp(root))
+        return el in memo["hits"]
+    return match
+
+
+def _select(tree, selector: str) -> list:
+    """Sélecteur CSS sur l'arbre (selectolax, lxml ou bs4)."""
+    if _DOM == "lexbor":
+        return tree.css(selector)
+    if _DOM == "lxml":
+        return _xpath(selector)(tree)
+    simple = _parse_simple_selector(selector)
+    if simple is not None:
+        # find_all évite la compilation soupsieve du sélecteur
+        tag, cls = simple
+        return tree.find_all(tag or True, class_=cls) if cls else tree.find_all(tag)
+    return tree.select(selector)
+
+
+_TEXT_NODES = XPath(".//text()") if lxml_html is not None else None
+
+
+def _node_text(node, separator: str) -> str:
+    """Texte d'un nœud, fragments nettoyés et joints par `separator`."""
+    if _DOM == "lexbor":
+        # Pas node.text(strip=True) : les nœuds texte blancs y laissent des
+        # séparateurs en trop (« a   b ») ; même règle que lxml et bs4
+        texts = (n.text_content.strip() for n in node.traverse(include_text=True) if n.tag == "-text")
+        return separator.join(t for t in texts if t)
+    if _DOM == "lxml":
+        return separator.join(t for t in (t.strip() for t in _TEXT_NODES(node)) if t)
+    return node.get_text(separator=separator, strip=True)
+
+
+def _matches(node, selector: str) -> bool:
+    """Le nœud correspond-il au sélecteur CSS ? (test local, sans parcours)"""
+    if _DOM == "lexbor":
+        return node.css_matches(selector)
+    simple = _parse_simple_selector(selector)
+    if simple is not None:
+        tag, cls = simple
+        if _DOM == "lxml":
+            return (tag is None or node.tag == tag) and (cls is None or cls in (node.get("class") or "").split())
+        return (tag is None or node.name == tag) and (cls is None or cls in node.get("class", ()))
+    if _DOM == "lxml":
+        return _lxml_matcher(selector)(node)
+    return node.css.match(selector)
+
+
+def _compile_selectors(selectors: list[str]) -> Optional[tuple]:
+    """Précompile le sélecteur combiné et les tests des sélecteurs non
+    simples : XPath pour lxml, soupsieve pour bs4. Retourne (select(tree),
+    [match(el) ou None]) ; None avec selectolax ou si la compilation échoue
+    (les chaînes sont alors utilisées telles quelles)."""
+    try:
+        if _DOM == "lxml":
+            combined = _xpath(", ".join(selectors))
+            each = [None if _parse_simple_selector(sel) else _lxml_matcher(sel) for sel in selectors]
+            return combined, each
+        if _DOM == "bs4":
+            combined = soupsieve.compile(", ".join(selectors)).select
+            each = [None if _parse_simple_selector(sel) else soupsieve.compile(sel).match for sel in selectors]
+            return combined, each
+    except Exception:
+        return None
+    return None
+
+
+def _select_first_matching(tree, selectors: list[str], compiled: Optional[tuple] = None) -> tuple[str, list]:
+    """Éléments du premier sélecteur (par priorité) qui trouve quelque chose.
+
+    Un seul parcours de l'arbre avec le sélecteur combiné, puis chaque
+    élément est rangé sous le premier sélecteur qu'il satisfait : le plus
+    prioritaire des sélecteurs non vides obtient exactement ses éléments,
+    dans l'ordre du document — même résultat qu'un select() par sélecteur.
+    """
+    combined, each = compiled or (None, [None] * len(selectors))
+    try:
+        found = combined(tree) if combined is not None else _select(tree, ", ".join(selectors))
+    except Exception:
+        found = None
+    if found is None:
+        # Sélecteur combiné refusé par le moteur : sonde un à un
+        for sel in selectors:
+            try:
+                found = _select(tree, sel)
+            except Exception:
+                continue
+            if found:
+                return sel, found
+        return "", []
+
+    if _DOM == "lexbor":
+        # lexbor renvoie un nœud une fois par sélecteur de la liste qu'il
+        # satisfait : dédoublonnage par identité, ordre du document conservé
+        seen: set[int] = set()
+        found = [el for el in found if el.mem_id not in seen and not seen.add(el.mem_id)]
+
+    buckets: dict[int, list] = {}
+    for el in found:
+        for i, sel in enumerate(selectors):
+            try:
+                hit = each[i](el) if each[i] is not None else _matches(el, sel)
+            except Exception:
+                continue
+            if hit:
+                buckets.setdefault(i, []).append(el)
+                break
+    if not buckets:
+        return "", []
+    best = min(buckets)
+    return selectors[best], buckets[best]
+
+
+def _body_text(tree) -> str:
+    """Texte complet du <body> (fallback sans structure), ou "" si absent."""
+    if _DOM == "bs4":
+        # Le SoupStrainer ne garde pas <body> : la racine filtrée en tient lieu
+        return _node_text(tree, "\n")
+    body = tree.body if _DOM == "lexbor" else tree.find("body")
+    return _node_text(body, "\n") if body is not None else ""
+
+
 # ---------------------------------------------------------------------------
 # Parsers
 # ---------------------------------------------------------------------------
 
+_ART_RE = re.compile(r"Art\.?\s*(\d+[a-z]?)")
+_ART_HEAD_RE = re.compile(r"(Art\.|§)\s*(\d+[a-z]?)")
+_ART_SPLIT_RE = re.compile(r"(?=\b(?:Art\.|§)\s*\d+)")
+_PARA_SPLIT_RE = re.compile(r"\n{2,}")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]")
+
+
+def _normalize_ws(text: str) -> str:
+    """Réduit les blancs (Unicode, NBSP compris) à une espace et retire ceux
+    de début et de fin. split/join : 2-3x plus rapide qu'une regex \\s+."""
+    return " ".join(text.split())
+
+
+def _base_kwargs(canton: str, law_name: str, rs: str, url: str, lang: str) -> dict[str, str]:
+    """Métadonnées communes à tous les chunks d'une loi, construites une
+    fois et internées : tous les chunks partagent les mêmes objets str."""
+    return {
+        "jurisdiction": sys.intern(canton),
+        "law_name": sys.intern(law_name),
+        "rs_cantonal": sys.intern(rs),
+        "source_url": sys.intern(url),
+        "language": sys.intern(lang),
+    }
+
+
+# Sélecteurs génériques essayés après ceux propres à chaque canton
+_GENERIC_SELECTORS = [
+    "div[id^='art']", "div[class*='article']", "p[id^='art']",
+    "section", "article", ".legis-text p", "td.article",
+]
+
+
 def parse_html_generic(html: str, selector: str, law_meta: dict) -> list[CantonalChunk]:
     """
     Parser générique HTML : essaie plusieurs sélecteurs CSS courants
     sur les portails de législation cantonaux suisses.
     Retourne une liste de chunks par article.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    chunks: list[CantonalChunk] = []
+    tree = _parse_dom(html)
     canton = law_meta["jurisdiction"]
-    law_name = law_meta["name"]
-    rs = law_meta.get("rs_cantonal", "")
-    lang = law_meta.get("lang", "fr")
-    url = law_meta.get("url", "")
-
-    # Sélecteurs à essayer dans l'ordre
-    selectors = [s.strip() for s in selector.split(",")]
-    selectors += [
-        "div[id^='art']", "div[class*='article']", "p[id^='art']",
-        "section", "article", ".legis-text p", "td.article",
-    ]
 
-    elements = []
-    for sel in selectors:
-        try:
-            found = soup.select(sel)
-            if found:
-                elements = found
-                log.info(f"[{canton}] Found {len(found)} elements with selector '{sel}'")
-                break
-        except Exception:
-            continue
+    # Extracteur spécialisé, construit une fois par loi (et par sélecteur)
+    cached = law_meta.get("_extractor")
+    if cached is None or cached[0] != selector:
+        cached = law_meta["_extractor"] = (selector, _make_extractor(selector, law_meta))
+    chunks = cached[1](tree)
 
-    if not elements:
+    if chunks is None:
         # Fallback : prendre tout le body et chunker par paragraphe
         log.warning(f"[{canton}] No structured elements found, falling back to paragraph split")
-        body = soup.find("body")
-        if body:
-            raw_text = body.get_text(separator="\n", strip=True)
-            chunks = _chunk_raw_text(raw_text, canton, law_name, rs, url, lang)
-        return chunks
+        raw_text = _body_text(tree)
+        if not raw_text:
+            return []
+        return _chunk_raw_text(
+            raw_text, canton, law_meta["name"], law_meta.get("rs_cantonal", ""),
+            law_meta.get("url", ""), law_meta.get("lang", "fr"),
+        )
 
-    for i, el in enumerate(elements):
-        text = el.get_text(separator=" ", strip=True)
-        text = re.sub(r"\s+", " ", text)
-        if len(text) < MIN_CHUNK_CHARS:
-            continue
+    log.info(f"[{canton}] Parsed {len(chunks)} chunks from {law_meta['name']}")
+    return chunks
 
-        # Tenter d'extraire le numéro d'article
-        art_match = re.search(r"Art\.?\s*(\d+[a-z]?)", text)
-        art_number = f"Art. {art_match.group(1)}" if art_match else f"§{i+1}"
-        art_id = f"{canton.lower()}_{re.sub(r'[^a-z0-9]', '', law_name.lower()[:15])}_art_{i+1}"
 
-        # Chunker si texte trop long
-        sub_chunks = _split_text(text, MAX_CHUNK_CHARS)
-        for j, chunk_text in enumerate(sub_chunks):
-            chunks.append(CantonalChunk(
+def _make_extractor(selector: str, law_meta: dict):
+    """Fabrique l'extracteur d'une loi : sélecteurs (précompilés), préfixe
+    d'identifiant et métadonnées sont résolus ici une fois pour toutes et
+    liés dans la fermeture ; la boucle interne ne fait plus de lookups dans
+    law_meta. L'extracteur retourne None si aucun élément structuré."""
+    canton = law_meta["jurisdiction"]
+    law_name = law_meta["name"]
+    selectors = [s.strip() for s in selector.split(",")] + _GENERIC_SELECTORS
+    compiled = _compile_selectors(selectors)
+    art_prefix = f"{canton.lower()}_{_NON_ALNUM_RE.sub('', law_name.lower()[:15])}_art_"
+    base = _base_kwargs(
+        canton, law_name, law_meta.get("rs_cantonal", ""),
+        law_meta.get("url", ""), law_meta.get("lang", "fr"),
+    )
+
+    def extract(tree, chunk_cls=CantonalChunk) -> Optional[list[CantonalChunk]]:
+        sel, elements = _select_first_matching(tree, selectors, compiled)
+        if not elements:
+            return None
+        log.info(f"[{canton}] Found {len(elements)} elements with selector '{sel}'")
+        chunks: list[CantonalChunk] = []
+        append = chunks.append
+        for i, j, art_number, chunk_text in _emit_articles(elements):
+            art_id = f"{art_prefix}{i+1}"
+            append(chunk_cls(
                 article_id=f"{art_id}_{j}" if j > 0 else art_id,
                 article_number=art_number,
                 text=chunk_text,
-                jurisdiction=canton,
-                law_name=law_name,
-                rs_cantonal=rs,
-                source_url=url,
-                language=lang,
+                **base,
             ))
+        return chunks
+
+    extract.__name__ = f"_extract_{canton}"
+    return extract
 
-    log.info(f"[{canton}] Parsed {len(chunks)} chunks from {law_name}")
-    return chunks
+
+def _emit_articles(elements: list) -> Iterator[tuple[int, int, str, str]]:
+    """Passe unique sur les éléments : texte → blancs → n° d'article →
+    découpage, sans liste intermédiaire. Produit (i, j, article_number, texte)
+    où i est l'indice de l'élément et j celui du sous-chunk."""
+    for i, el in enumerate(elements):
+        text = _normalize_ws(_node_text(el, " "))
+        if len(text) < MIN_CHUNK_CHARS:
+            continue
+        # Le numéro figure en tête d'article ; plus loin ce sont des renvois
+        art_match = _ART_RE.search(text, 0, ART_PREFIX_CHARS)
+        art_number = f"Art. {art_match.group(1)}" if art_match else f"§{i+1}"
+        for j, chunk_text in enumerate(_iter_split(text, MAX_CHUNK_CHARS)):
+            yield i, j, art_number, chunk_text
 
 
 def parse_pdf_text(raw_text: str, law_meta: dict) -> list[CantonalChunk]:
@@ -472,14 +945,15 @@ def parse_pdf_text(raw_text: str, law_meta: dict) -> list[CantonalChunk]:
     url = law_meta.get("url", "")
 
     # Découper par "Art." ou "§"
-    articles = re.split(r"(?=\b(?:Art\.|§)\s*\d+)", raw_text)
+    articles = _ART_SPLIT_RE.split(raw_text)
     chunks: list[CantonalChunk] = []
+    base = _base_kwargs(canton, law_name, rs, url, lang)
 
     for i, art_text in enumerate(articles):
         art_text = art_text.strip()
         if len(art_text) < MIN_CHUNK_CHARS:
             continue
-        art_match = re.match(r"(Art\.|§)\s*(\d+[a-z]?)", art_text)
+        art_match = _ART_HEAD_RE.match(art_text)
         art_number = f"Art. {art_match.group(2)}" if art_match else f"§{i+1}"
         art_id = f"{canton.lower()}_stg_art_{i+1}"
 
@@ -489,11 +963,7 @@ def parse_pdf_text(raw_text: str, law_meta: dict) -> list[CantonalChunk]:
                 article_id=f"{art_id}_{j}" if j > 0 else art_id,
                 article_number=art_number,
                 text=chunk_text,
-                jurisdiction=canton,
-                law_name=law_name,
-                rs_cantonal=rs,
-                source_url=url,
-                language=lang,
+                **base,
             ))
 
     log.info(f"[{canton}] Parsed {len(chunks)} chunks from PDF")
@@ -502,8 +972,9 @@ def parse_pdf_text(raw_text: str, law_meta: dict) -> list[CantonalChunk]:
 
 def _chunk_raw_text(text: str, canton: str, law_name: str, rs: str, url: str, lang: str) -> list[CantonalChunk]:
     """Fallback : chunker du texte brut par paragraphes."""
-    paragraphs = [p.strip() for p in re.split(r"\n{2,}", text) if len(p.strip()) > MIN_CHUNK_CHARS]
+    paragraphs = [p.strip() for p in _PARA_SPLIT_RE.split(text) if len(p.strip()) > MIN_CHUNK_CHARS]
     chunks = []
+    base = _base_kwargs(canton, law_name, rs, url, lang)
     for i, para in enumerate(paragraphs):
         sub = _split_text(para, MAX_CHUNK_CHARS)
         for j, chunk_text in enumerate(sub):
@@ -511,11 +982,7 @@ def _chunk_raw_text(text: str, canton: str, law_name: str, rs: str, url: str, la
                 article_id=f"{canton.lower()}_raw_{i}_{j}",
                 article_number=f"§{i+1}",
                 text=chunk_text,
-                jurisdiction=canton,
-                law_name=law_name,
-                rs_cantonal=rs,
-                source_url=url,
-                language=lang,
+                **base,
             ))
     return chunks
 
@@ -524,22 +991,68 @@ def _split_text(text: str, max_chars: int) -> list[str]:
     """Découpe un texte en sous-chunks de max_chars caractères, sur des frontières de phrases."""
     if len(text) <= max_chars:
         return [text]
-    chunks = []
-    while len(text) > max_chars:
-        split_pos = text.rfind(". ", 0, max_chars)
-        if split_pos == -1:
-            split_pos = max_chars
-        chunks.append(text[:split_pos + 1].strip())
-        text = text[split_pos + 1:].strip()
-    if text:
-        chunks.append(text)
-    return chunks
+    return [text[a:b].strip() for a, b in _split_offsets(text, max_chars)]
+
+
+def _iter_split(text: str, max_chars: int) -> Iterator[str]:
+    """Version générateur de _split_text."""
+    if len(text) <= max_chars:
+        yield text
+        return
+    for a, b in _split_offsets(text, max_chars):
+        yield text[a:b].strip()
+
+
+def _split_offsets(text: str, max_chars: int) -> list[tuple[int, int]]:
+    """Bornes (début, fin) des sous-chunks, calculées en un seul parcours.
+
+    Aucune chaîne n'est allouée pendant le scan (que des indices) : les
+    tranches ne sont découpées qu'ensuite, une fois chacune.
+    """
+    bounds = []
+    start, end = 0, len(text.rstrip())
+    while end - start > max_chars:
+        split_pos = text.rfind(". ", start, start + max_chars)
+        stop = split_pos + 1 if split_pos != -1 else start + max_chars + 1
+        bounds.append((start, stop))
+        start = stop
+        while start < end and text[start].isspace():
+            start += 1
+    if start < end:
+        bounds.append((start, end))
+    return bounds
 
 
 # ---------------------------------------------------------------------------
 # Scraper principal
 # ---------------------------------------------------------------------------
 
+def _canton_file(canton: str) -> Path:
+    return OUTPUT_DIR / f"{canton.lower()}_tax.json"
+
+
+def _load_canton(canton: str) -> list[CantonalChunk]:
+    """Relit les chunks d'un précédent scrape."""
+    return _read_chunks(_canton_file(canton))
+
+
+def _read_chunks(path: Path) -> list[CantonalChunk]:
+    """Relit un fichier de chunks (format colonnes, ou ancien format liste
+    d'objets)."""
+    if orjson is not None:
+        data = orjson.loads(path.read_bytes())
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    if isinstance(data, list):
+        return [CantonalChunk(**d) for d in data]
+    # Le décodage JSON crée une str par cellule : interner les colonnes de
+    # métadonnées (identiques sur toute la loi) pour n'en garder qu'une copie
+    for name in _INTERNED_FIELDS:
+        data[name] = [sys.intern(v) for v in data[name]]
+    return [CantonalChunk(*row) for row in zip(*(data[name] for name in _CHUNK_FIELDS))]
+
+
 def scrape_canton(canton_code: str) -> list[CantonalChunk]:
     """Scrappe la loi fiscale d'un canton et retourne les chunks."""
     meta = CANTONAL_TAX_LAWS.get(canton_code.upper())
@@ -555,37 +1068,102 @@ def scrape_canton(canton_code: str) -> list[CantonalChunk]:
         log.warning(f"[{canton_code}] Mode manual — URL needs exploration: {url}")
         return []
 
+    # GET conditionnel seulement si un export précédent peut être réutilisé
+    conditional = _canton_file(canton_code).exists()
+
     if mode == "pdf":
-        raw = fetch_pdf_text(url)
+        raw = fetch_pdf_text(url, conditional)
+        if raw is NOT_MODIFIED:
+            log.info(f"[{canton_code}] Not modified — reusing previous export")
+            return _load_canton(canton_code)
         if not raw:
             return []
         return parse_pdf_text(raw, meta)
 
     # HTML
-    html = fetch_html(url)
+    html = fetch_html(url, conditional)
+    if html is NOT_MODIFIED:
+        log.info(f"[{canton_code}] Not modified — reusing previous export")
+        return _load_canton(canton_code)
     if not html:
         log.error(f"[{canton_code}] Failed to fetch HTML from {url}")
         return []
 
     selector = meta.get("selector", "div.article")
-    return parse_html_generic(html, selector, meta)
+    cache_file = CHUNK_CACHE_DIR / f"{_chunk_cache_key(html, selector, meta)}.json"
+    if cache_file.exists():
+        log.info(f"[{canton_code}] Chunk cache hit — skipping parse")
+        return _read_chunks(cache_file)
+    chunks = parse_html_generic(html, selector, meta)
+    _write_chunks(cache_file, chunks)
+    return chunks
 
 
-def scrape_all_cantons(cantons: Optional[list[str]] = None) -> dict[str, list[CantonalChunk]]:
-    """Scrappe tous les cantons (ou une liste filtrée)."""
-    target = cantons if cantons else list(CANTONAL_TAX_LAWS.keys())
-    results = {}
-    for canton in target:
-        chunks = scrape_canton(canton)
-        results[canton] = chunks
+def _chunk_cache_key(html: str, selector: str, meta: dict) -> str:
+    """Clé du cache de chunks : blake2b (plusieurs Go/s) du HTML et de tout
+    ce qui influe sur le résultat du parsing."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in (str(CHUNK_CACHE_VERSION), selector, meta["jurisdiction"], meta["name"],
+                 meta.get("rs_cantonal", ""), meta.get("url", ""), meta.get("lang", "fr")):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    h.update(html.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _to_columns(chunks: list[CantonalChunk]) -> dict[str, list]:
+    """Sérialisation en colonnes (une liste par champ) : les clés ne sont
+    écrites qu'une fois par fichier, pas une fois par chunk."""
+    if not chunks:
+        return {name: [] for name in _CHUNK_FIELDS}
+    columns = zip(*map(_chunk_row, chunks))
+    return {name: list(col) for name, col in zip(_CHUNK_FIELDS, columns)}
+
+
+def _save_canton(canton: str, chunks: list[CantonalChunk], pretty: bool = False) -> Path:
+    """Écrit les chunks d'un canton en JSON (format colonnes), compact sauf
+    si `pretty` (indentation pour relecture humaine)."""
+    out_file = _canton_file(canton)
+    _write_chunks(out_file, chunks, pretty)
+    return out_file
+
+
+def _write_chunks(path: Path, chunks: list[CantonalChunk], pretty: bool = False) -> None:
+    """Écrit des chunks en JSON colonnes (orjson si disponible)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = _to_columns(chunks)
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2 if pretty else 0))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2 if pretty else None)
+
+
+async def _scrape_all_cantons_async(target: list[str], pretty: bool = False) -> dict[str, list[CantonalChunk]]:
+    """Scrappe les cantons en parallèle (MAX_CONCURRENT_CANTONS au plus).
+    La politesse par hôte est assurée dans _get (_wait_for_host)."""
+    sem = asyncio.Semaphore(MAX_CONCURRENT_CANTONS)
+
+    async def _one(canton: str) -> tuple[str, list[CantonalChunk]]:
+        async with sem:
+            chunks = await asyncio.to_thread(scrape_canton, canton)
         if chunks:
-            OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-            out_file = OUTPUT_DIR / f"{canton.lower()}_tax.json"
-            with open(out_file, "w", encoding="utf-8") as f:
-                json.dump([asdict(c) for c in chunks], f, ensure_ascii=False, indent=2)
+            # Écriture disque hors de la boucle événementielle
+            out_file = await asyncio.to_thread(_save_canton, canton, chunks, pretty)
+            _commit_validators(CANTONAL_TAX_LAWS[canton.upper()]["url"])
             log.info(f"[{canton}] Saved {len(chunks)} chunks → {out_file}")
-        time.sleep(REQUEST_DELAY)
-    return results
+        return canton, chunks
+
+    try:
+        return dict(await asyncio.gather(*(_one(c) for c in target)))
+    finally:
+        _flush_etags()
+
+
+def scrape_all_cantons(cantons: Optional[list[str]] = None, pretty: bool = False) -> dict[str, list[CantonalChunk]]:
+    """Scrappe tous les cantons (ou une liste filtrée)."""
+    target = cantons if cantons else list(CANTONAL_TAX_LAWS.keys())
+    return asyncio.run(_scrape_all_cantons_async(target, pretty))
 
 
 # ---------------------------------------------------------------------------
@@ -599,6 +1177,8 @@ def main():
     parser.add_argument("--mode", default="scrape",
                         choices=["scrape", "list"],
                         help="Mode d'exécution")
+    parser.add_argument("--pretty", action="store_true",
+                        help="JSON indenté (lisible, ~2x plus gros)")
     args = parser.parse_args()
 
     if args.mode == "list":
@@ -611,10 +1191,10 @@ def main():
         return
 
     if args.canton.upper() == "ALL":
-        scrape_all_cantons()
+        scrape_all_cantons(pretty=args.pretty)
     else:
         cantons = [c.strip().upper() for c in args.canton.split(",")]
-        scrape_all_cantons(cantons)
+        scrape_all_cantons(cantons, pretty=args.pretty)
 
 
 if __name__ == "__main__":
@@ -8,12 +8,14 @@ Usage:
 import os
 import sys
 import asyncio
+import hashlib
 import argparse
 import logging
 import time
 
 import asyncpg
 import httpx
+from pgvector.asyncpg import register_vector
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 log = logging.getLogger("embed_chunks")
@@ -22,6 +24,10 @@ COHERE_API_KEY = os.getenv("COHERE_API_KEY", "")
 EMBEDDING_MODEL = "embed-multilingual-v3.0"
 BATCH_SIZE = 96  # Cohere max
 EMBEDDING_DIM = 1024
+EMBED_MAX_CHARS = 8000   # longer chunks are truncated before embedding
+EMBED_CONCURRENCY = 3    # Cohere calls in flight
+EMBED_INTERVAL = 0.6     # min seconds between call starts (trial: ~100 calls/min)
+WRITE_QUEUE_SIZE = 4     # embedded batches waiting for the DB writer
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost:5432/soluris")
 if DATABASE_URL.startswith("postgres://"):
@@ -36,24 +42,89 @@ async def get_stats(conn):
     return total, embedded
 
 
-async def embed_batch(texts: list[str]) -> list[list[float]]:
-    """Embed a batch of texts via Cohere API."""
-    async with httpx.AsyncClient(timeout=120) as client:
-        resp = await client.post(
-            "https://api.cohere.ai/v1/embed",
-            headers={
-                "Authorization": f"Bearer {COHERE_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": EMBEDDING_MODEL,
-                "texts": texts,
-                "input_type": "search_document",
-                "truncate": "END",
-            },
+def text_hash(text: str) -> bytes:
+    """128-bit content hash of a (truncated) chunk text, the embedding cache key."""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+async def prepare_stage(conn):
+    """Session-local staging tables with legal_chunks' own column types
+    (UUID or SERIAL ids, vector or halfvec(1024))."""
+    await conn.execute("ALTER TABLE legal_chunks ADD COLUMN IF NOT EXISTS text_hash BYTEA")
+    await conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_text_hash ON legal_chunks(text_hash)")
+    await conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS stage_hash AS
+        SELECT id, text_hash FROM legal_chunks LIMIT 0
+    """)
+    await conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS stage_emb AS
+        SELECT text_hash, embedding FROM legal_chunks LIMIT 0
+    """)
+
+
+async def store_hashes(conn, ids: list, hashes: list[bytes]):
+    """Record the text hash of each chunk about to be embedded."""
+    async with conn.transaction():
+        await conn.copy_records_to_table(
+            "stage_hash", records=list(zip(ids, hashes)), columns=["id", "text_hash"],
         )
-        resp.raise_for_status()
-        return resp.json()["embeddings"]
+        await conn.execute("""
+            UPDATE legal_chunks lc SET text_hash = s.text_hash
+            FROM stage_hash s WHERE lc.id = s.id
+        """)
+        await conn.execute("TRUNCATE stage_hash")
+
+
+async def fill_from_cache(conn, hashes: list[bytes]) -> set[bytes]:
+    """Copy already-stored embeddings onto un-embedded chunks with the same
+    text hash, server-side. Returns the hashes that were served this way."""
+    rows = await conn.fetch("""
+        UPDATE legal_chunks lc SET embedding = c.embedding
+        FROM (
+            SELECT DISTINCT ON (text_hash) text_hash, embedding FROM legal_chunks
+            WHERE embedding IS NOT NULL AND text_hash = ANY($1::bytea[])
+        ) c
+        WHERE lc.embedding IS NULL AND lc.text_hash = c.text_hash
+        RETURNING lc.text_hash
+    """, hashes)
+    return {r["text_hash"] for r in rows}
+
+
+async def store_embeddings(conn, hashes: list[bytes], embeddings: list[list[float]]) -> int:
+    """Write one batch of embeddings: binary COPY into the staging table, then
+    a single set-based UPDATE keyed on text hash, so every chunk sharing a
+    text gets the vector (one round-trip per batch instead of per chunk,
+    vectors sent as 4-byte floats instead of formatted text).
+    Returns the number of chunks updated."""
+    async with conn.transaction():
+        await conn.copy_records_to_table(
+            "stage_emb", records=list(zip(hashes, embeddings)), columns=["text_hash", "embedding"],
+        )
+        status = await conn.execute("""
+            UPDATE legal_chunks lc SET embedding = s.embedding
+            FROM stage_emb s WHERE lc.text_hash = s.text_hash
+        """)
+        await conn.execute("TRUNCATE stage_emb")
+    return int(status.split()[-1])
+
+
+async def embed_batch(texts: list[str], client: httpx.AsyncClient) -> list[list[float]]:
+    """Embed a batch of texts via Cohere API."""
+    resp = await client.post(
+        "https://api.cohere.ai/v1/embed",
+        headers={
+            "Authorization": f"Bearer {COHERE_API_KEY}",
+            "Content-Type": "application/json",
+        },
+        json={
+            "model": EMBEDDING_MODEL,
+            "texts": texts,
+            "input_type": "search_document",
+            "truncate": "END",
+        },
+    )
+    resp.raise_for_status()
+    return resp.json()["embeddings"]
 
 
 async def run(embed_all: bool = False, stats_only: bool = False):
@@ -63,8 +134,9 @@ async def run(embed_all: bool = False, stats_only: bool = False):
 
     conn = await asyncpg.connect(DATABASE_URL)
 
-    # Ensure pgvector
+    # Ensure pgvector (+ binary codecs for the vector and halfvec types)
     await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+    await register_vector(conn)
 
     total, embedded = await get_stats(conn)
 
@@ -87,43 +159,100 @@ async def run(embed_all: bool = False, stats_only: bool = False):
         await conn.close()
         return
 
-    # Process in batches
+    await prepare_stage(conn)
+
+    # Hash every chunk as it will be sent to Cohere: identical texts are
+    # embedded once, and (unless re-embedding everything) texts that already
+    # have a stored embedding are not sent at all
+    texts = {}
+    hashes = []
+    for r in rows:
+        text = r["chunk_text"][:EMBED_MAX_CHARS]
+        h = text_hash(text)
+        hashes.append(h)
+        texts.setdefault(h, text)
+    await store_hashes(conn, [r["id"] for r in rows], hashes)
+
+    cached = 0
+    if not embed_all:
+        for h in await fill_from_cache(conn, list(texts)):
+            del texts[h]
+            cached += 1
+    todo = list(texts.items())
+    log.info(f"🧮 {len(todo)} distinct texts to embed ({len(rows) - len(texts) - cached} duplicates, {cached} served from cache)")
+
+    if not todo:
+        await get_stats(conn)
+        await conn.close()
+        return
+
+    # Pipeline: up to EMBED_CONCURRENCY Cohere calls in flight (starts spaced
+    # by EMBED_INTERVAL) feed a bounded queue; a single writer drains it, so
+    # batch N is written while batch N+1 is being embedded
     start = time.time()
     processed = 0
     errors = 0
+    sent = 0
+    n_batches = (len(todo) + BATCH_SIZE - 1) // BATCH_SIZE
+    loop = asyncio.get_running_loop()
+    next_slot = 0.0
+    sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+    queue = asyncio.Queue(maxsize=WRITE_QUEUE_SIZE)
 
-    for i in range(0, len(rows), BATCH_SIZE):
-        batch = rows[i:i + BATCH_SIZE]
-        texts = [r["chunk_text"][:8000] for r in batch]  # Truncate long chunks
-        ids = [r["id"] for r in batch]
+    def _failed(n, e):
+        nonlocal errors, next_slot
+        log.error(f"  ❌ Batch {n} failed: {e}")
+        errors += 1
+        if errors > 5:
+            log.error("Too many errors, aborting.")
+        next_slot = max(next_slot, loop.time() + 5)  # Back off on error
 
+    async def embed_one(n, batch, client):
+        nonlocal next_slot
         try:
-            embeddings = await embed_batch(texts)
+            # Rate limiting: reserve the next call slot
+            slot = max(loop.time(), next_slot)
+            next_slot = slot + EMBED_INTERVAL
+            await asyncio.sleep(slot - loop.time())
+            if errors > 5:
+                return
+            try:
+                embeddings = await embed_batch([t for _, t in batch], client)
+            except Exception as e:
+                _failed(n, e)
+                return
+            await queue.put((n, [h for h, _ in batch], embeddings))
+        finally:
+            sem.release()
 
-            # Store embeddings
-            for chunk_id, embedding in zip(ids, embeddings):
-                embedding_str = "[" + ",".join(str(x) for x in embedding) + "]"
-                await conn.execute(
-                    "UPDATE legal_chunks SET embedding = $1::vector WHERE id = $2",
-                    embedding_str, chunk_id,
-                )
+    async def embedder():
+        async with httpx.AsyncClient(timeout=120) as client:
+            tasks = []
+            for n, i in enumerate(range(0, len(todo), BATCH_SIZE), 1):
+                await sem.acquire()
+                if errors > 5:
+                    sem.release()
+                    break
+                tasks.append(asyncio.create_task(embed_one(n, todo[i:i + BATCH_SIZE], client)))
+            await asyncio.gather(*tasks)
+        await queue.put(None)
 
-            processed += len(batch)
+    async def writer():
+        nonlocal processed, sent
+        while (item := await queue.get()) is not None:
+            n, batch_hashes, embeddings = item
+            try:
+                processed += await store_embeddings(conn, batch_hashes, embeddings)
+            except Exception as e:
+                _failed(n, e)
+                continue
+            sent += len(batch_hashes)
             elapsed = time.time() - start
-            rate = processed / elapsed
-            remaining = (len(rows) - processed) / rate if rate > 0 else 0
-            log.info(f"  ✅ Batch {i // BATCH_SIZE + 1}: {processed}/{len(rows)} ({rate:.0f} chunks/s, ~{remaining:.0f}s remaining)")
+            rate = sent / elapsed
+            remaining = (len(todo) - sent) / rate if rate > 0 else 0
+            log.info(f"  ✅ Batch {n}/{n_batches}: {sent}/{len(todo)} texts, {processed} chunks ({rate:.0f} texts/s, ~{remaining:.0f}s remaining)")
 
-            # Rate limiting: Cohere allows ~100 calls/min for trial
-            await asyncio.sleep(0.5)
-
-        except Exception as e:
-            log.error(f"  ❌ Batch {i // BATCH_SIZE + 1} failed: {e}")
-            errors += 1
-            if errors > 5:
-                log.error("Too many errors, aborting.")
-                break
-            await asyncio.sleep(5)  # Back off on error
+    await asyncio.gather(embedder(), writer())
 
     elapsed = time.time() - start
     log.info(f"\n🎯 Done! {processed} chunks embedded in {elapsed:.0f}s ({errors} errors)")
@@ -18,6 +18,11 @@ from pathlib import Path
 
 import asyncpg
 
+try:
+    import ijson  # streaming parser for multi-document dumps
+except ImportError:
+    ijson = None
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 log = logging.getLogger("ingest_fedlex")
 
@@ -27,87 +32,99 @@ if DATABASE_URL.startswith("postgres://"):
 
 DATA_DIR = Path(__file__).parent.parent.parent / "data" / "fedlex"
 
-
-async def ingest_file(conn, filepath: Path) -> tuple[int, int]:
-    """Ingest a single JSON file into legal_documents + legal_chunks."""
-    with open(filepath) as f:
+POOL_MIN_SIZE = 4
+POOL_MAX_SIZE = 8  # files ingested concurrently (one connection each)
+
+
+def iter_docs(filepath: Path):
+    """Yield the documents of a JSON file: a single document object, or an
+    array of them. Arrays are streamed with ijson when available, so a large
+    dump is never fully loaded; a single object is read with json.load."""
+    with open(filepath, "rb") as f:
+        head = f.read(1)
+        while head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if head == b"[" and ijson is not None:
+            yield from ijson.items(f, "item", use_float=True)
+            return
         data = json.load(f)
-
     # Handle both single doc and array of docs
-    docs = data if isinstance(data, list) else [data]
+    yield from data if isinstance(data, list) else [data]
+
+
+async def ingest_doc(pool, doc: dict) -> int:
+    """Ingest one document and its chunks (one pooled connection, one
+    transaction). Returns the number of chunks written."""
+    rs_number = doc.get("rs_number", "")
+    title = doc.get("title", "")
+    uri = doc.get("uri", "")
+    url = doc.get("url", "")
+    content = doc.get("content", "")
+    chunks = doc.get("chunks", [])
+
+    # Chunk rows (articles, or paragraphs as a simple fallback)
+    if chunks:
+        records = [
+            (i, chunk_text[:10000], chunk.get("article_ref", chunk.get("reference", f"Art. {i+1}")),
+             chunk.get("url", url))
+            for i, chunk in enumerate(chunks)
+            if (chunk_text := chunk.get("text", "")).strip()
+        ]
+    elif content:
+        # No pre-chunked data — chunk by paragraphs (simple fallback)
+        paragraphs = [p.strip() for p in content.split("\n\n") if p.strip() and len(p.strip()) > 50]
+        records = [
+            (i, para[:10000], f"RS {rs_number} §{i+1}", url)
+            for i, para in enumerate(paragraphs[:500])  # Max 500 chunks per doc
+        ]
+    else:
+        records = []
+
+    # Document + its chunks in one transaction: a single COPY for all
+    # chunks, and a failure rolls back the document instead of leaving
+    # it half-ingested
+    async with pool.acquire() as conn, conn.transaction():
+        doc_id = await conn.fetchval(
+            """
+            INSERT INTO legal_documents (source, external_id, doc_type, title, reference, language, content, url, metadata)
+            VALUES ('fedlex', $1, 'legislation', $2, $3, 'fr', $4, $5, $6)
+            ON CONFLICT (source, external_id) DO UPDATE
+                SET title = EXCLUDED.title, content = EXCLUDED.content, url = EXCLUDED.url
+            RETURNING id
+            """,
+            rs_number, title, f"RS {rs_number}", content[:50000] if content else "",
+            url or uri, json.dumps({"rs_number": rs_number, "uri": uri}),
+        )
+        if records:
+            await conn.copy_records_to_table(
+                "legal_chunks",
+                records=[(doc_id, *r) for r in records],
+                columns=["document_id", "chunk_index", "chunk_text", "source_ref", "source_url"],
+            )
+    return len(records)
+
+
+async def ingest_file(pool, filepath: Path) -> tuple[int, int]:
+    """Ingest a single JSON file into legal_documents + legal_chunks,
+    one document at a time as it is parsed."""
     total_docs = 0
     total_chunks = 0
 
-    for doc in docs:
-        rs_number = doc.get("rs_number", "")
-        title = doc.get("title", "")
-        uri = doc.get("uri", "")
-        url = doc.get("url", "")
-        content = doc.get("content", "")
-        chunks = doc.get("chunks", [])
-        pub_date = doc.get("publication_date")
-
-        # Insert document
+    for doc in iter_docs(filepath):
         try:
-            doc_id = await conn.fetchval(
-                """
-                INSERT INTO legal_documents (source, external_id, doc_type, title, reference, language, content, url, metadata)
-                VALUES ('fedlex', $1, 'legislation', $2, $3, 'fr', $4, $5, $6)
-                ON CONFLICT (source, external_id) DO UPDATE
-                    SET title = EXCLUDED.title, content = EXCLUDED.content, url = EXCLUDED.url
-                RETURNING id
-                """,
-                rs_number, title, f"RS {rs_number}", content[:50000] if content else "",
-                url or uri, json.dumps({"rs_number": rs_number, "uri": uri}),
-            )
-            total_docs += 1
+            total_chunks += await ingest_doc(pool, doc)
         except Exception as e:
-            log.error(f"  Failed to insert doc RS {rs_number}: {e}")
+            log.error(f"  Failed to ingest doc RS {doc.get('rs_number', '')}: {e}")
             continue
-
-        # Insert chunks (articles)
-        if chunks:
-            for i, chunk in enumerate(chunks):
-                chunk_text = chunk.get("text", "")
-                article_ref = chunk.get("article_ref", chunk.get("reference", f"Art. {i+1}"))
-                article_url = chunk.get("url", url)
-
-                if not chunk_text.strip():
-                    continue
-
-                try:
-                    await conn.execute(
-                        """
-                        INSERT INTO legal_chunks (document_id, chunk_index, chunk_text, source_ref, source_url)
-                        VALUES ($1, $2, $3, $4, $5)
-                        """,
-                        doc_id, i, chunk_text[:10000], article_ref, article_url,
-                    )
-                    total_chunks += 1
-                except Exception as e:
-                    log.error(f"  Failed chunk {article_ref}: {e}")
-        elif content:
-            # No pre-chunked data — chunk by paragraphs (simple fallback)
-            paragraphs = [p.strip() for p in content.split("\n\n") if p.strip() and len(p.strip()) > 50]
-            for i, para in enumerate(paragraphs[:500]):  # Max 500 chunks per doc
-                try:
-                    await conn.execute(
-                        """
-                        INSERT INTO legal_chunks (document_id, chunk_index, chunk_text, source_ref, source_url)
-                        VALUES ($1, $2, $3, $4, $5)
-                        """,
-                        doc_id, i, para[:10000], f"RS {rs_number} §{i+1}", url,
-                    )
-                    total_chunks += 1
-                except Exception as e:
-                    pass
+        total_docs += 1
 
     return total_docs, total_chunks
 
 
 async def run(filepath: str = None, scrape_first: bool = False):
-    conn = await asyncpg.connect(DATABASE_URL)
-    await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+    pool = await asyncpg.create_pool(DATABASE_URL, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE)
+    await pool.execute("CREATE EXTENSION IF NOT EXISTS vector;")
 
     if scrape_first:
         log.info("🔄 Running Fedlex scraper in priority mode first...")
@@ -130,39 +147,50 @@ async def run(filepath: str = None, scrape_first: bool = False):
         if not DATA_DIR.exists():
             log.error(f"Data directory not found: {DATA_DIR}")
             log.info("Run the scraper first: python -m backend.scrapers.fedlex --mode priority")
-            await conn.close()
+            await pool.close()
             return
         files = sorted(DATA_DIR.glob("*.json"))
 
     if not files:
         log.warning("No JSON files found to ingest")
-        await conn.close()
+        await pool.close()
         return
 
     log.info(f"📥 Ingesting {len(files)} files...")
 
-    for f in files:
-        try:
-            docs, chunks = await ingest_file(conn, f)
-            total_docs += docs
-            total_chunks += chunks
-            log.info(f"  ✅ {f.name}: {docs} docs, {chunks} chunks")
-        except Exception as e:
-            log.error(f"  ❌ {f.name}: {e}")
+    # At most POOL_MAX_SIZE files open and parsed at once (the semaphore is
+    # taken before iter_docs reads anything, so memory stays bounded by a few
+    # files, not the corpus); ON CONFLICT on (source, external_id) keeps
+    # concurrent upserts of the same act safe
+    sem = asyncio.Semaphore(POOL_MAX_SIZE)
+
+    async def _bounded(f: Path) -> tuple[int, int]:
+        async with sem:
+            return await ingest_file(pool, f)
+
+    results = await asyncio.gather(*(_bounded(f) for f in files), return_exceptions=True)
+    for f, result in zip(files, results):
+        if isinstance(result, Exception):
+            log.error(f"  ❌ {f.name}: {result}")
+            continue
+        docs, chunks = result
+        total_docs += docs
+        total_chunks += chunks
+        log.info(f"  ✅ {f.name}: {docs} docs, {chunks} chunks")
 
     log.info(f"\n🎯 Total: {total_docs} documents, {total_chunks} chunks ingested")
 
     # Show DB stats
-    doc_count = await conn.fetchval("SELECT COUNT(*) FROM legal_documents")
-    chunk_count = await conn.fetchval("SELECT COUNT(*) FROM legal_chunks")
-    embedded = await conn.fetchval("SELECT COUNT(*) FROM legal_chunks WHERE embedding IS NOT NULL")
+    doc_count = await pool.fetchval("SELECT COUNT(*) FROM legal_documents")
+    chunk_count = await pool.fetchval("SELECT COUNT(*) FROM legal_chunks")
+    embedded = await pool.fetchval("SELECT COUNT(*) FROM legal_chunks WHERE embedding IS NOT NULL")
     log.info(f"📊 DB totals: {doc_count} documents, {chunk_count} chunks, {embedded} embedded")
 
     if chunk_count > embedded:
         log.info(f"\n💡 {chunk_count - embedded} chunks need embedding. Run:")
         log.info("   python -m backend.scripts.embed_chunks")
 
-    await conn.close()
+    await pool.close()
 
 
 if __name__ == "__main__":
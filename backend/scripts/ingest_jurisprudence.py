@@ -5,7 +5,7 @@ and inserts court decisions + chunks into the database.
 
 Usage:
     python -m backend.scripts.ingest_jurisprudence                     # Ingest all batches
-    python -m backend.scripts.ingest_jurisprudence --file data/jurisprudence/ch_bge_999_fr_batch_0001.json
+    python -m backend.scripts.ingest_jurisprudence --file data/jurisprudence/all_CH_BGE_999_fr_batch_0001.meta.json
     python -m backend.scripts.ingest_jurisprudence --scrape --limit 500  # Scrape then ingest
 """
 import os
@@ -14,10 +14,13 @@ import json
 import asyncio
 import argparse
 import logging
+from datetime import date
 from pathlib import Path
 
 import asyncpg
 
+from backend.scrapers.entscheidsuche import batch_files, load_batch
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 log = logging.getLogger("ingest_jurisprudence")
 
@@ -28,26 +31,36 @@ if DATABASE_URL.startswith("postgres://"):
 DATA_DIR = Path(__file__).parent.parent.parent / "data" / "jurisprudence"
 
 
+def _parse_date(value) -> date | None:
+    """ISO date (or datetime) string → date; None when missing or malformed."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
 async def ingest_batch(conn, filepath: Path) -> tuple[int, int]:
-    """Ingest a single batch JSON file into legal_documents + legal_chunks."""
-    with open(filepath) as f:
-        data = json.load(f)
+    """Ingest a single batch (.meta.json index or legacy JSON) into legal_documents + legal_chunks.
+
+    Decisions are upserted with one multi-row INSERT (column arrays through
+    unnest) and chunks loaded with one COPY, instead of a round-trip per row,
+    all in one transaction per file. The upsert text is constant, so
+    asyncpg's statement cache prepares it once per connection and reuses it
+    for every following file.
+    """
+    data = load_batch(filepath)
 
     decisions = data.get("decisions", [])
     chunks = data.get("chunks", [])
-    total_docs = 0
-    total_chunks = 0
-
-    # Build a map of decision_id → doc_id for chunk insertion
-    doc_id_map = {}
 
+    # One row per external_id (the last one wins, as with row-by-row
+    # upserts): ON CONFLICT DO UPDATE cannot touch the same row twice
+    rows = {}
     for dec in decisions:
         ref = dec.get("reference", [])
         ref_str = ref[0] if ref else dec["id"]
-        external_id = dec["id"]
-
-        # Determine jurisdiction from hierarchy
-        jurisdiction = "CH"  # All TF decisions are federal
 
         metadata = {
             "chamber": dec.get("chamber", ""),
@@ -57,37 +70,63 @@ async def ingest_batch(conn, filepath: Path) -> tuple[int, int]:
             "content_url": dec.get("content_url", ""),
         }
 
-        try:
-            doc_id = await conn.fetchval(
+        rows[dec["id"]] = (
+            dec["id"],
+            dec.get("title_fr", "") or ref_str,
+            ref_str,
+            "CH",  # All TF decisions are federal
+            dec.get("language", "fr"),
+            dec.get("abstract_fr", "")[:50000],
+            dec.get("content_url", ""),
+            json.dumps(metadata),
+            _parse_date(dec.get("date")),
+        )
+
+    if not rows:
+        return 0, 0
+
+    # Decisions and their chunks in one transaction: a failed COPY rolls
+    # back the upserts instead of leaving decisions without chunks
+    try:
+        async with conn.transaction():
+            returned = await conn.fetch(
                 """
                 INSERT INTO legal_documents
                     (source, external_id, doc_type, title, reference, jurisdiction, language, content, url, metadata, publication_date)
-                VALUES ('entscheidsuche', $1, 'jurisprudence', $2, $3, $4, $5, $6, $7, $8, $9::date)
+                SELECT 'entscheidsuche', u.external_id, 'jurisprudence', u.title, u.reference, u.jurisdiction,
+                       u.language, u.content, u.url, u.metadata, u.publication_date
+                FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[], $6::text[],
+                            $7::text[], $8::jsonb[], $9::date[])
+                    AS u(external_id, title, reference, jurisdiction, language, content, url, metadata, publication_date)
                 ON CONFLICT (source, external_id) DO UPDATE
                     SET title = EXCLUDED.title, content = EXCLUDED.content,
                         reference = EXCLUDED.reference, metadata = EXCLUDED.metadata
-                RETURNING id
+                RETURNING id, external_id
                 """,
-                external_id,
-                dec.get("title_fr", "") or ref_str,
-                ref_str,
-                jurisdiction,
-                dec.get("language", "fr"),
-                dec.get("abstract_fr", "")[:50000],
-                dec.get("content_url", ""),
-                json.dumps(metadata),
-                dec.get("date") if dec.get("date") else None,
+                *map(list, zip(*rows.values())),
             )
-            doc_id_map[external_id] = doc_id
-            total_docs += 1
-        except Exception as e:
-            log.error(f"  Failed to insert decision {ref_str}: {e}")
-            continue
+            # Map decision_id → doc_id for chunk insertion
+            doc_id_map = {r["external_id"]: r["id"] for r in returned}
+
+            # Chunks are insert-only: binary COPY, no per-row INSERT parsing
+            chunk_rows = _chunk_records(chunks, doc_id_map)
+            await conn.copy_records_to_table(
+                "legal_chunks",
+                records=chunk_rows,
+                columns=["document_id", "chunk_index", "chunk_text", "source_ref", "source_url"],
+            )
+    except Exception as e:
+        log.error(f"  Failed to ingest {filepath.name}: {e}")
+        return 0, 0
 
-    # Insert chunks
+    return len(doc_id_map), len(chunk_rows)
+
+
+def _chunk_records(chunks: list[dict], doc_id_map: dict) -> list[tuple]:
+    """legal_chunks rows for the chunks of upserted decisions (short or empty chunks skipped)."""
+    records = []
     for chunk in chunks:
-        decision_id = chunk.get("decision_id", "")
-        doc_id = doc_id_map.get(decision_id)
+        doc_id = doc_id_map.get(chunk.get("decision_id", ""))
         if not doc_id:
             continue
 
@@ -102,23 +141,14 @@ async def ingest_batch(conn, filepath: Path) -> tuple[int, int]:
         if chunk_type and chunk_type not in ("full_text", "metadata_only", "header"):
             source_ref = f"{ref} — {chunk_type.replace('_', ' ').title()}"
 
-        try:
-            await conn.execute(
-                """
-                INSERT INTO legal_chunks (document_id, chunk_index, chunk_text, source_ref, source_url)
-                VALUES ($1, $2, $3, $4, $5)
-                """,
-                doc_id,
-                chunk.get("chunk_index", 0),
-                chunk_text[:10000],
-                source_ref,
-                chunk.get("source_url", ""),
-            )
-            total_chunks += 1
-        except Exception as e:
-            log.error(f"  Failed chunk {source_ref}: {e}")
-
-    return total_docs, total_chunks
+        records.append((
+            doc_id,
+            chunk.get("chunk_index", 0),
+            chunk_text[:10000],
+            source_ref,
+            chunk.get("source_url", ""),
+        ))
+    return records
 
 
 async def run(filepath: str = None, scrape_first: bool = False, limit: int = None):
@@ -153,7 +183,7 @@ async def run(filepath: str = None, scrape_first: bool = False, limit: int = Non
             log.info("Run the scraper first: python -m backend.scrapers.entscheidsuche --mode atf")
             await conn.close()
             return
-        files = sorted(DATA_DIR.glob("*.json"))
+        files = batch_files(DATA_DIR)
 
     if not files:
         log.warning("No JSON files found to ingest")
@@ -0,0 +1,105 @@
+"""Migrate legal_chunks.embedding from vector(1024) to halfvec(1024)
+
+fp16 halves the table, the HNSW index and the bytes read per similarity
+search; Cohere embeddings lose no measurable top-k recall at half precision.
+Needs pgvector >= 0.7 (halfvec type).
+
+The vector operator classes do not accept halfvec, so every index on the
+embedding column (init_db's idx_chunk_embedding_hnsw, services/ingestion's
+idx_chunks_embedding, any other) is dropped, the column is converted and the
+HNSW index is rebuilt with halfvec_cosine_ops — all in one transaction: on any
+error nothing is changed and the script exits non-zero.
+
+The table is locked for the whole rewrite + index build. Restart the API
+afterwards: init_db reads the column type at startup.
+
+Usage:
+    python -m backend.scripts.migrate_halfvec              # Migrate
+    python -m backend.scripts.migrate_halfvec --dry-run    # Show the indexes that would be dropped
+"""
+import os
+import sys
+import asyncio
+import argparse
+import logging
+import time
+
+import asyncpg
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+log = logging.getLogger("migrate_halfvec")
+
+EMBEDDING_DIM = 1024
+
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost:5432/soluris")
+if DATABASE_URL.startswith("postgres://"):
+    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+
+
+async def embedding_indexes(conn) -> list[str]:
+    """Schema-qualified names of every index depending on legal_chunks.embedding
+    (key column, expression or partial-index predicate)."""
+    rows = await conn.fetch("""
+        SELECT DISTINCT format('%I.%I', n.nspname, c.relname) AS name
+        FROM pg_depend d
+        JOIN pg_class c ON c.oid = d.objid AND c.relkind = 'i'
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+        WHERE d.classid = 'pg_class'::regclass
+          AND d.refclassid = 'pg_class'::regclass
+          AND d.refobjid = 'legal_chunks'::regclass
+          AND a.attname = 'embedding'
+    """)
+    return [r["name"] for r in rows]
+
+
+async def run(dry_run: bool = False):
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        async with conn.transaction():
+            udt = await conn.fetchval("""
+                SELECT udt_name FROM information_schema.columns
+                WHERE table_name = 'legal_chunks' AND column_name = 'embedding'
+            """)
+            if udt == "halfvec":
+                log.info("✅ legal_chunks.embedding is already halfvec — nothing to do")
+                return
+            if udt != "vector":
+                raise RuntimeError(f"legal_chunks.embedding has type {udt!r}, expected vector")
+            if not await conn.fetchval("SELECT EXISTS(SELECT 1 FROM pg_type WHERE typname = 'halfvec')"):
+                raise RuntimeError("halfvec type not available — upgrade pgvector to >= 0.7")
+
+            indexes = await embedding_indexes(conn)
+            log.info(f"🗑️ Indexes on embedding: {', '.join(indexes) or 'none'}")
+            if dry_run:
+                return
+
+            start = time.time()
+            for name in indexes:
+                await conn.execute(f"DROP INDEX {name}")
+            log.info(f"🔄 Converting legal_chunks.embedding to halfvec({EMBEDDING_DIM})...")
+            await conn.execute(
+                f"ALTER TABLE legal_chunks ALTER COLUMN embedding TYPE halfvec({EMBEDDING_DIM}) "
+                f"USING embedding::halfvec({EMBEDDING_DIM})"
+            )
+            log.info("🏗️ Rebuilding HNSW index...")
+            # Same name and parameters as init_db
+            await conn.execute("""
+                CREATE INDEX idx_chunk_embedding_hnsw
+                ON legal_chunks USING hnsw (embedding halfvec_cosine_ops)
+                WITH (m = 16, ef_construction = 200)
+            """)
+        log.info(f"✅ Migration complete in {time.time() - start:.0f}s — restart the API")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="Only list the indexes that would be dropped")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(dry_run=args.dry_run))
+    except Exception as e:
+        log.error(f"❌ Migration failed, nothing changed: {e}")
+        sys.exit(1)
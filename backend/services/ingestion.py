@@ -21,6 +21,7 @@ import logging
 import os
 import time
 from pathlib import Path
+from uuid import UUID
 
 log = logging.getLogger("soluris.ingestion")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
@@ -82,9 +83,11 @@ CREATE INDEX IF NOT EXISTS idx_documents_external_id ON legal_documents(external
 -- Note: Create HNSW index AFTER inserting data (faster build)
 """
 
+# {type} is the column's pgvector type (vector, or halfvec once migrated by
+# backend/scripts/migrate_halfvec.py): the operator class must match it
 CREATE_HNSW_INDEX = """
 CREATE INDEX IF NOT EXISTS idx_chunks_embedding ON legal_chunks
-    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+    USING hnsw (embedding {type}_cosine_ops) WITH (m = 16, ef_construction = 64);
 """
 
 
@@ -147,13 +150,15 @@ async def insert_chunks(conn, document_id: int, chunks: list[dict]):
     """, records)
 
 
-async def update_embeddings(conn, chunk_id: int, embedding: list[float]):
-    """Update the embedding vector for a chunk."""
-    # pgvector expects a string format: '[0.1, 0.2, ...]'
-    vec_str = "[" + ",".join(f"{v:.8f}" for v in embedding) + "]"
-    await conn.execute(
-        "UPDATE legal_chunks SET embedding = $1::vector WHERE id = $2",
-        vec_str, chunk_id
+async def update_embeddings(conn, chunk_ids: list[UUID], embeddings: list[list[float]]):
+    """Update the embedding vectors of a batch of chunks.
+
+    `conn` must have pgvector's codecs registered (register_vector): vectors
+    are sent in binary, without formatting each float as text.
+    """
+    await conn.executemany(
+        "UPDATE legal_chunks SET embedding = $1 WHERE id = $2",
+        list(zip(embeddings, chunk_ids)),
     )
 
 
@@ -254,9 +259,9 @@ def _infer_domain_from_rs(rs: str) -> str:
 # ---------------------------------------------------------------------------
 
 def _juris_json_to_documents(json_path: str) -> list[tuple[dict, list[dict]]]:
-    """Convert an entscheidsuche JSON batch file to (document, chunks) pairs."""
-    with open(json_path, encoding="utf-8") as f:
-        data = json.load(f)
+    """Convert an entscheidsuche batch (.meta.json index or legacy JSON) to (document, chunks) pairs."""
+    from backend.scrapers.entscheidsuche import load_batch
+    data = load_batch(json_path)
 
     decisions = data.get("decisions", [])
     chunks_raw = data.get("chunks", [])
@@ -345,7 +350,8 @@ async def ingest_fedlex(pool, data_dir: str = "data/fedlex"):
 
 async def ingest_jurisprudence(pool, data_dir: str = "data/jurisprudence"):
     """Ingest entscheidsuche jurisprudence data into PostgreSQL."""
-    files = sorted(glob.glob(os.path.join(data_dir, "*.json")))
+    from backend.scrapers.entscheidsuche import batch_files
+    files = [str(f) for f in batch_files(Path(data_dir))]
     if not files:
         log.warning(f"No jurisprudence JSON files found in {data_dir}")
         return
@@ -368,7 +374,10 @@ async def ingest_jurisprudence(pool, data_dir: str = "data/jurisprudence"):
 
 
 async def generate_embeddings(pool, embedding_service=None):
-    """Generate embeddings for all chunks that don't have one yet."""
+    """Generate embeddings for all chunks that don't have one yet.
+
+    `pool` connections must have pgvector's codecs registered (main_async
+    creates it with init=register_vector)."""
     if embedding_service is None:
         from backend.services.embeddings import get_embedding_service
         embedding_service = get_embedding_service()
@@ -385,8 +394,7 @@ async def generate_embeddings(pool, embedding_service=None):
         embeddings = embedding_service.embed_documents(texts)
 
         async with pool.acquire() as conn:
-            for chunk, emb in zip(chunks, embeddings):
-                await update_embeddings(conn, chunk["id"], emb)
+            await update_embeddings(conn, [c["id"] for c in chunks], embeddings)
 
         total_embedded += len(chunks)
         log.info(f"  Embedded {total_embedded} chunks so far...")
@@ -397,7 +405,11 @@ async def generate_embeddings(pool, embedding_service=None):
     if total_embedded > 0:
         async with pool.acquire() as conn:
             log.info("Creating HNSW index on embeddings...")
-            await conn.execute(CREATE_HNSW_INDEX)
+            udt = await conn.fetchval("""
+                SELECT udt_name FROM information_schema.columns
+                WHERE table_name = 'legal_chunks' AND column_name = 'embedding'
+            """)
+            await conn.execute(CREATE_HNSW_INDEX.format(type="halfvec" if udt == "halfvec" else "vector"))
             log.info("HNSW index created")
 
 
@@ -407,7 +419,16 @@ async def generate_embeddings(pool, embedding_service=None):
 
 async def main_async(args):
     import asyncpg
-    pool = await asyncpg.create_pool(args.database_url, min_size=2, max_size=5)
+    from pgvector.asyncpg import register_vector
+
+    # Create the extension before the pool opens, so each connection
+    # registers pgvector's codecs once, when it is opened (as database.py does)
+    conn = await asyncpg.connect(args.database_url)
+    try:
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+    finally:
+        await conn.close()
+    pool = await asyncpg.create_pool(args.database_url, min_size=2, max_size=5, init=register_vector)
 
     try:
         await init_schema(pool)
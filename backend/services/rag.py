@@ -10,14 +10,22 @@ Architecture:
 """
 import os
 import json
+import asyncio
 import logging
 import httpx
-from typing import List, Dict, Optional
+from contextlib import nullcontext
+from typing import AsyncContextManager, AsyncIterator, Callable, List, Dict, Optional
 
 from backend.db import database
 
 log = logging.getLogger("soluris.rag")
 
+try:
+    import h2  # noqa: F401  (httpx[http2])
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
 # -- Configuration --
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 ANTHROPIC_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-haiku-4-5-20251001")
@@ -25,6 +33,7 @@ COHERE_API_KEY = os.getenv("COHERE_API_KEY", "")
 EMBEDDING_MODEL = "embed-multilingual-v3.0"
 EMBEDDING_DIM = 1024
 TOP_K_CHUNKS = 10
+BATCH_CONCURRENCY = int(os.getenv("RAG_BATCH_CONCURRENCY", "4"))  # Claude calls in flight per batch
 CONFIDENCE_THRESHOLD = 0.35
 HIGH_CONFIDENCE = 0.55
 LOW_CONFIDENCE_MSG = (
@@ -70,35 +79,67 @@ SYSTEM_PROMPT_NO_RAG = (
 )
 
 
-async def embed_text(text: str) -> Optional[List[float]]:
-    """Generate embedding for a text using Cohere multilingual-v3."""
+# -- Shared HTTP client --
+# One pooled client for Cohere and Anthropic: keep-alive connections (and
+# HTTP/2 multiplexing when available) are reused across requests instead of
+# paying a TLS handshake per call. Created lazily inside the event loop.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=60,
+            http2=_HTTP2,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def embed_texts(texts: List[str]) -> Optional[List[List[float]]]:
+    """Generate embeddings for several texts in a single Cohere call."""
     if not COHERE_API_KEY:
         log.warning("COHERE_API_KEY not set - skipping embedding")
         return None
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(
-                "https://api.cohere.ai/v1/embed",
-                headers={
-                    "Authorization": f"Bearer {COHERE_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": EMBEDDING_MODEL,
-                    "texts": [text],
-                    "input_type": "search_query",
-                    "truncate": "END",
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return data["embeddings"][0]
+        resp = await _http().post(
+            "https://api.cohere.ai/v1/embed",
+            headers={
+                "Authorization": f"Bearer {COHERE_API_KEY}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": EMBEDDING_MODEL,
+                "texts": texts,
+                "input_type": "search_query",
+                "truncate": "END",
+            },
+            timeout=30,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data["embeddings"]
     except Exception as e:
         log.error(f"Embedding failed: {e}")
         return None
 
 
+async def embed_text(text: str) -> Optional[List[float]]:
+    """Generate embedding for a text using Cohere multilingual-v3."""
+    embeddings = await embed_texts([text])
+    return embeddings[0] if embeddings else None
+
+
 async def search_legal_chunks(
     question_embedding: List[float],
     top_k: int = TOP_K_CHUNKS,
@@ -119,9 +160,14 @@ async def search_legal_chunks(
                 log.warning("pgvector not installed - RAG search unavailable")
                 return []
 
-            embedding_str = "[" + ",".join(str(x) for x in question_embedding) + "]"
+            # Binary codec on the pool: the list goes out as packed floats,
+            # no per-float str() for the text form
+            if database.VECTOR_CODEC:
+                embedding_param = question_embedding
+            else:
+                embedding_param = "[" + ",".join(str(x) for x in question_embedding) + "]"
             where_parts = ["lc.embedding IS NOT NULL"]
-            params = [embedding_str, top_k]
+            params = [embedding_param, top_k]
             param_idx = 3
 
             if jurisdiction:
@@ -147,11 +193,11 @@ async def search_legal_chunks(
                     lc.chunk_text, lc.source_ref, lc.source_url,
                     ld.title AS doc_title, ld.reference AS doc_reference,
                     ld.doc_type, ld.jurisdiction, ld.url AS doc_url, ld.metadata,
-                    1 - (lc.embedding <=> $1::vector) AS similarity
+                    1 - (lc.embedding <=> $1::{database.EMBEDDING_TYPE}) AS similarity
                 FROM legal_chunks lc
                 JOIN legal_documents ld ON lc.document_id = ld.id
                 WHERE {where_clause}
-                ORDER BY lc.embedding <=> $1::vector
+                ORDER BY lc.embedding <=> $1::{database.EMBEDDING_TYPE}
                 LIMIT $2
                 """,
                 *params,
@@ -215,19 +261,21 @@ def format_chunks_as_context(chunks: List[Dict]) -> str:
     return "\n".join(parts)
 
 
-async def generate_answer(
+async def _prepare_generation(
     question: str,
     history: List[Dict],
-    jurisdiction: Optional[str] = None,
-    legal_domain: Optional[str] = None,
+    jurisdiction: Optional[str],
+    legal_domain: Optional[str],
+    question_embedding: Optional[List[float]],
 ) -> Dict:
-    """Generate a legal answer using Claude API with RAG context."""
+    """RAG retrieval + prompt assembly shared by the blocking and streaming paths."""
 
     # Step 1-2: RAG retrieval
     chunks = []
     rag_available = False
 
-    question_embedding = await embed_text(question)
+    if question_embedding is None:
+        question_embedding = await embed_text(question)
     if question_embedding:
         chunks = await search_legal_chunks(
             question_embedding,
@@ -263,6 +311,72 @@ async def generate_answer(
     if not messages or messages[-1].get("content") != question:
         messages.append({"role": "user", "content": question})
 
+    return {
+        "chunks": chunks,
+        "rag_available": rag_available,
+        "confidence": confidence,
+        "system_prompt": system_prompt,
+        "messages": messages,
+    }
+
+
+def _anthropic_request(prepared: Dict, stream: bool = False) -> Dict:
+    """Headers + JSON payload for the Claude Messages API."""
+    payload = {
+        "model": ANTHROPIC_MODEL,
+        "max_tokens": 4096,
+        "system": prepared["system_prompt"],
+        "messages": prepared["messages"],
+    }
+    if stream:
+        payload["stream"] = True
+    return {
+        "headers": {
+            "x-api-key": ANTHROPIC_API_KEY,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json",
+        },
+        "json": payload,
+    }
+
+
+def _split_sources(full_text: str, rag_available: bool) -> tuple:
+    """Split Claude's answer into (response_text, sources) using the [SOURCES] block."""
+    sources = []
+    response_text = full_text
+    if "[SOURCES]" in full_text:
+        parts = full_text.split("[SOURCES]")
+        response_text = parts[0].strip()
+        if len(parts) > 1:
+            source_block = parts[1].split("[/SOURCES]")[0].strip()
+            try:
+                sources = json.loads(source_block)
+            except json.JSONDecodeError:
+                pass
+
+    for source in sources:
+        source["verified"] = rag_available
+    return response_text, sources
+
+
+async def generate_answer(
+    question: str,
+    history: List[Dict],
+    jurisdiction: Optional[str] = None,
+    legal_domain: Optional[str] = None,
+    question_embedding: Optional[List[float]] = None,
+) -> Dict:
+    """Generate a legal answer using Claude API with RAG context.
+
+    `question_embedding` may be supplied by callers that already embedded
+    the question (see generate_answers_batch).
+    """
+    prepared = await _prepare_generation(
+        question, history, jurisdiction, legal_domain, question_embedding,
+    )
+    chunks = prepared["chunks"]
+    rag_available = prepared["rag_available"]
+
     # Call Claude API
     if not ANTHROPIC_API_KEY:
         return {
@@ -271,23 +385,12 @@ async def generate_answer(
         }
 
     try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": ANTHROPIC_API_KEY,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json",
-                },
-                json={
-                    "model": ANTHROPIC_MODEL,
-                    "max_tokens": 4096,
-                    "system": system_prompt,
-                    "messages": messages,
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await _http().post(
+            "https://api.anthropic.com/v1/messages",
+            **_anthropic_request(prepared),
+        )
+        resp.raise_for_status()
+        data = resp.json()
 
         full_text = ""
         for block in data.get("content", []):
@@ -295,20 +398,7 @@ async def generate_answer(
                 full_text += block["text"]
 
         # Parse sources
-        sources = []
-        response_text = full_text
-        if "[SOURCES]" in full_text:
-            parts = full_text.split("[SOURCES]")
-            response_text = parts[0].strip()
-            if len(parts) > 1:
-                source_block = parts[1].split("[/SOURCES]")[0].strip()
-                try:
-                    sources = json.loads(source_block)
-                except json.JSONDecodeError:
-                    pass
-
-        for source in sources:
-            source["verified"] = rag_available
+        response_text, sources = _split_sources(full_text, rag_available)
 
         tokens = data.get("usage", {}).get("input_tokens", 0) + data.get("usage", {}).get("output_tokens", 0)
 
@@ -318,7 +408,7 @@ async def generate_answer(
             "tokens": tokens,
             "rag_chunks": len(chunks),
             "rag_available": rag_available,
-            "confidence": confidence,
+            "confidence": prepared["confidence"],
         }
 
     except httpx.HTTPStatusError as e:
@@ -332,3 +422,122 @@ async def generate_answer(
             "response": f"Erreur inattendue : {str(e)}",
             "sources": [], "tokens": 0, "rag_chunks": 0, "confidence": "none",
         }
+
+
+async def generate_answer_stream(
+    question: str,
+    history: List[Dict],
+    jurisdiction: Optional[str] = None,
+    legal_domain: Optional[str] = None,
+) -> AsyncIterator[Dict]:
+    """Streaming variant of generate_answer.
+
+    Yields events as dicts:
+      {"type": "context", "chunks": [...], "confidence": ...}  after retrieval
+      {"type": "text", "text": "..."}                          per Claude delta
+      {"type": "done", "sources": [...], "tokens": N, ...}     at the end
+      {"type": "error", "message": "..."}                      on failure
+    The trailing [SOURCES] block is withheld from text events and parsed
+    into the final "done" event instead.
+    """
+    prepared = await _prepare_generation(
+        question, history, jurisdiction, legal_domain, None,
+    )
+    chunks = prepared["chunks"]
+    rag_available = prepared["rag_available"]
+    yield {"type": "context", "chunks": chunks, "confidence": prepared["confidence"]}
+
+    if not ANTHROPIC_API_KEY:
+        yield {"type": "error", "message": "Cle API Anthropic non configuree. Ajoutez ANTHROPIC_API_KEY."}
+        return
+
+    marker = "[SOURCES]"
+    full_text = ""
+    sent = 0            # chars of full_text already emitted
+    marker_at = -1      # position of [SOURCES] once seen
+    tokens = 0
+
+    try:
+        async with _http().stream(
+            "POST",
+            "https://api.anthropic.com/v1/messages",
+            **_anthropic_request(prepared, stream=True),
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    event = json.loads(line[5:])
+                except json.JSONDecodeError:
+                    continue
+                etype = event.get("type")
+                if etype == "message_start":
+                    tokens += event.get("message", {}).get("usage", {}).get("input_tokens", 0)
+                elif etype == "message_delta":
+                    tokens += event.get("usage", {}).get("output_tokens", 0)
+                elif etype == "content_block_delta":
+                    delta = event.get("delta", {})
+                    if delta.get("type") != "text_delta":
+                        continue
+                    full_text += delta.get("text", "")
+                    if marker_at >= 0:
+                        continue
+                    marker_at = full_text.find(marker, max(0, sent - len(marker)))
+                    # Hold back a possible partial marker at the tail
+                    limit = marker_at if marker_at >= 0 else len(full_text) - len(marker) + 1
+                    if limit > sent:
+                        yield {"type": "text", "text": full_text[sent:limit]}
+                        sent = limit
+
+        if marker_at < 0 and sent < len(full_text):
+            yield {"type": "text", "text": full_text[sent:]}
+
+        _, sources = _split_sources(full_text, rag_available)
+        yield {
+            "type": "done",
+            "sources": sources,
+            "tokens": tokens,
+            "rag_chunks": len(chunks),
+            "rag_available": rag_available,
+            "confidence": prepared["confidence"],
+        }
+
+    except httpx.HTTPStatusError as e:
+        yield {"type": "error", "message": f"Erreur API Claude ({e.response.status_code}). Veuillez reessayer."}
+    except Exception as e:
+        log.error(f"Claude API stream error: {e}")
+        yield {"type": "error", "message": f"Erreur inattendue : {str(e)}"}
+
+
+async def generate_answers_batch(
+    questions: List[str],
+    jurisdiction: Optional[str] = None,
+    legal_domain: Optional[str] = None,
+    slot: Optional[Callable[[], AsyncContextManager]] = None,
+) -> List[Dict]:
+    """Answer several questions: one embedding call, then retrieval and
+    Claude generation per question, at most BATCH_CONCURRENCY at a time so a
+    single batch cannot fan out into dozens of simultaneous Claude calls.
+
+    `slot`, if given, is entered around each question's generation, so a
+    caller-wide concurrency limit counts every question, not every batch."""
+    if not questions:
+        return []
+
+    embeddings = await embed_texts(questions) or [None] * len(questions)
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def _one(question: str, embedding: Optional[List[float]]) -> Dict:
+        async with sem, (slot() if slot else nullcontext()):
+            return await generate_answer(
+                question,
+                history=[],
+                jurisdiction=jurisdiction,
+                legal_domain=legal_domain,
+                question_embedding=embedding,
+            )
+
+    return await asyncio.gather(*(
+        _one(question, embedding) for question, embedding in zip(questions, embeddings)
+    ))